@@ -0,0 +1,37 @@
+"""
+基于pypdfium2的逐页PDF文本提取
+
+evaluator.py、evaluate_system.py、debugger.py、llm_evaluator.py 共用此模块。
+每页的page和textpage用完立即关闭，不必等到垃圾回收；PDFium按CRLF分行，
+这里统一成\\n，与pdfplumber等其他提取方式的输出保持一致。
+未安装pypdfium2时导入此模块会抛出ImportError，调用方据此回退到其他PDF库。
+"""
+
+from typing import Callable, Iterator, Optional, Tuple
+
+import pypdfium2 as pdfium
+
+
+def iter_pdfium_pages(pdf_path: str, ocr: Optional[Callable] = None) -> Iterator[Tuple[int, str]]:
+    """
+    按页依次产出 (页码, 页面文本)，页码从1开始
+    Args:
+        pdf_path: PDF文件路径
+        ocr: 可选，页面没有文本层时调用 ocr(page) 得到识别出的文本
+    """
+    pdf = pdfium.PdfDocument(pdf_path)
+    try:
+        for page_num, page in enumerate(pdf, 1):
+            try:
+                textpage = page.get_textpage()
+                try:
+                    text = textpage.get_text_range().replace('\r\n', '\n')
+                finally:
+                    textpage.close()
+                if ocr is not None and not text.strip():
+                    text = ocr(page)
+            finally:
+                page.close()
+            yield page_num, text
+    finally:
+        pdf.close()
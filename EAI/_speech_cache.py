@@ -0,0 +1,84 @@
+"""
+幻灯片图片 → 演讲稿 的持久化LRU缓存
+
+键由图片内容的sha256和提示文本的md5组成：同一张幻灯片、同一版提示词再次生成时
+直接返回缓存结果，省掉整个API往返；修改提示词后键随之变化，旧结果自然失效。
+缓存保存在一个JSON文件中，按最近使用顺序淘汰超出容量的条目；
+set()只修改内存中的数据，调用方在一次生成/评估结束后调用flush()统一写盘。
+"""
+
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from typing import Iterable, Optional
+
+
+class SpeechCache:
+    """基于JSON文件的LRU缓存，记录命中率"""
+
+    def __init__(self, path: str = ".speech_cache.json", max_entries: int = 1024):
+        """
+        Args:
+            path: 缓存文件路径
+            max_entries: 最多保留的条目数
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._dirty = False
+        self._data = OrderedDict()
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self._data = OrderedDict(json.load(f))
+            except (OSError, ValueError) as e:
+                print(f"缓存文件读取失败，将重新建立: {e}")
+
+    @staticmethod
+    def make_key(image_bytes: Iterable[bytes], prompt: str) -> str:
+        """
+        根据图片内容和提示生成缓存键
+        Args:
+            image_bytes: 一张或多张图片的编码字节（多张时按顺序参与哈希）
+            prompt: 发送给模型的文本提示
+        """
+        h = hashlib.sha256()
+        for data in image_bytes:
+            h.update(data)
+        return h.hexdigest() + ":" + hashlib.md5(prompt.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        value = self._data.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: str):
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+        self._dirty = True
+
+    def flush(self):
+        """有未保存的修改时写盘一次"""
+        if self._dirty:
+            self.save()
+            self._dirty = False
+
+    def save(self):
+        """先写临时文件再替换，避免中断时留下损坏的缓存文件"""
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._data, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def stats(self) -> str:
+        total = self.hits + self.misses
+        rate = self.hits / total if total else 0.0
+        return f"缓存命中 {self.hits}/{total} ({rate:.0%})，共 {len(self._data)} 条"
@@ -4,6 +4,85 @@
 
 import json
 import os
+import re
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+# 读写文本文件：二进制读写 + 显式UTF-8编解码，使用128KiB缓冲区
+IO_BUFFER_SIZE = 128 * 1024
+
+# clean_pdf_text 使用的正则，模块加载时预编译
+# 多个空行 -> 两个换行；多个空格 -> 一个空格（合并为单次扫描）
+_RE_WHITESPACE = re.compile(r'(\n\s*\n)|( +)')
+_RE_PAGE_MARK = re.compile(r'--- Page \d+ ---\n')
+_RE_DASHES = re.compile(r'-{3,}')
+_RE_EQUALS = re.compile(r'={3,}')
+
+
+def _pages_pypdfium2(pdf_path):
+    from _pdfium_text import iter_pdfium_pages
+    return [text for _, text in iter_pdfium_pages(pdf_path)]
+
+
+def _pages_pdfplumber(pdf_path):
+    import pdfplumber
+    with pdfplumber.open(pdf_path) as pdf:
+        return [page.extract_text() for page in pdf.pages]
+
+
+def _pages_pypdf2(pdf_path):
+    import PyPDF2
+    with open(pdf_path, 'rb') as f:
+        return [page.extract_text() for page in PyPDF2.PdfReader(f).pages]
+
+
+def _select_backends():
+    """模块加载时按速度优先级列出已安装的PDF库: pypdfium2 > pdfplumber > PyPDF2"""
+    import importlib.util
+    return [(module_name, extractor)
+            for module_name, extractor in (('pypdfium2', _pages_pypdfium2),
+                                           ('pdfplumber', _pages_pdfplumber),
+                                           ('PyPDF2', _pages_pypdf2))
+            if importlib.util.find_spec(module_name) is not None]
+
+
+_PDF_BACKENDS = _select_backends()
+
+
+def _extract_pages(pdf_path):
+    """依次尝试已安装的PDF库逐页提取文本，返回 (库名, [(页码, 文本)])，跳过空白页
+
+    某个库读取失败时回退到下一个；全部失败时抛出最后一个异常
+    """
+    error = None
+    for module_name, extractor in _PDF_BACKENDS:
+        try:
+            pages = extractor(pdf_path)
+        except Exception as e:
+            print(f"  {module_name} 读取失败: {e}")
+            error = e
+            continue
+        return module_name, [(i, text) for i, text in enumerate(pages, 1) if text]
+    raise error
+
+
+def _loads_json(content):
+    """解析JSON，优先使用orjson（支持bytes/str），失败时抛出ValueError"""
+    if HAS_ORJSON:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def _count_lines(text):
+    """统计行数（与len(text.splitlines())一致），用str.count避免生成行列表"""
+    if not text:
+        return 0
+    return text.count('\n') + (0 if text.endswith('\n') else 1)
+
 
 def analyze_text_length(slides_path, speech_path):
     """分析文本长度"""
@@ -20,37 +99,26 @@ def analyze_text_length(slides_path, speech_path):
     if slides_path.endswith('.pdf'):
         print(f"文件类型: PDF")
 
-        # 尝试提取
+        if not _PDF_BACKENDS:
+            print("✗ 无法读取PDF: 未安装 pypdfium2 / pdfplumber / PyPDF2")
+            return
+
         try:
-            import pdfplumber
-            with pdfplumber.open(slides_path) as pdf:
-                slides_text = ""
-                for i, page in enumerate(pdf.pages, 1):
-                    page_text = page.extract_text()
-                    if page_text:
-                        slides_text += page_text + "\n"
-                        print(f"  第{i}页: {len(page_text)} 字符")
-        except:
-            try:
-                import PyPDF2
-                with open(slides_path, 'rb') as f:
-                    pdf = PyPDF2.PdfReader(f)
-                    slides_text = ""
-                    for i, page in enumerate(pdf.pages, 1):
-                        page_text = page.extract_text()
-                        if page_text:
-                            slides_text += page_text + "\n"
-                            print(f"  第{i}页: {len(page_text)} 字符")
-            except:
-                print("✗ 无法读取PDF")
-                return
+            backend, pages = _extract_pages(slides_path)
+        except Exception as e:
+            print(f"✗ 无法读取PDF: {e}")
+            return
+        print(f"使用PDF库: {backend}")
+        for i, page_text in pages:
+            print(f"  第{i}页: {len(page_text)} 字符")
+        slides_text = "\n".join(page_text for _, page_text in pages)
     else:
         # 文本文件
-        with open(slides_path, 'r', encoding='utf-8') as f:
-            slides_text = f.read()
+        with open(slides_path, 'rb', buffering=IO_BUFFER_SIZE) as f:
+            slides_text = f.read().decode('utf-8')
 
     print(f"\n幻灯片总字符数: {len(slides_text)}")
-    print(f"幻灯片总行数: {len(slides_text.splitlines())}")
+    print(f"幻灯片总行数: {_count_lines(slides_text)}")
     print(f"幻灯片总词数(英文): {len(slides_text.split())}")
 
     # 显示前500字符
@@ -63,25 +131,30 @@ def analyze_text_length(slides_path, speech_path):
     print("\n【2. 演讲稿JSON】")
     print("-" * 80)
 
-    with open(speech_path, 'r', encoding='utf-8') as f:
-        speech_json = f.read()
+    with open(speech_path, 'rb', buffering=IO_BUFFER_SIZE) as f:
+        speech_raw = f.read()
+    speech_json = speech_raw.decode('utf-8')
 
     print(f"JSON总字符数: {len(speech_json)}")
-    print(f"JSON总行数: {len(speech_json.splitlines())}")
+    print(f"JSON总行数: {_count_lines(speech_json)}")
 
     # 解析JSON
     try:
-        # 清理可能的markdown标记
-        cleaned = speech_json.strip()
-        if cleaned.startswith('```json'):
-            cleaned = cleaned[7:]
-        if cleaned.startswith('```'):
-            cleaned = cleaned[3:]
-        if cleaned.endswith('```'):
-            cleaned = cleaned[:-3]
-        cleaned = cleaned.strip()
-
-        data = json.loads(cleaned)
+        try:
+            # 快速路径：文件本身就是合法JSON，orjson直接解析原始字节
+            data = _loads_json(speech_raw)
+        except ValueError:
+            # 清理可能的markdown标记
+            cleaned = speech_json.strip()
+            if cleaned.startswith('```json'):
+                cleaned = cleaned[7:]
+            if cleaned.startswith('```'):
+                cleaned = cleaned[3:]
+            if cleaned.endswith('```'):
+                cleaned = cleaned[:-3]
+            cleaned = cleaned.strip()
+
+            data = _loads_json(cleaned)
 
         plan_count = len(data.get('plan', []))
         script_count = len(data.get('script', []))
@@ -90,10 +163,12 @@ def analyze_text_length(slides_path, speech_path):
         print(f"Script项数: {script_count}")
 
         # 分析每个script的长度
+        lens = [len(item.get('text', '')) for item in data.get('script', [])]
         print(f"\nScript各项长度:")
-        for i, item in enumerate(data.get('script', []), 1):
-            text = item.get('text', '')
-            print(f"  Script {i}: {len(text)} 字符")
+        print("\n".join(f"  Script {i}: {n} 字符" for i, n in enumerate(lens, 1)))
+        if script_count > 0:
+            total = sum(lens)
+            print(f"  合计: {total} 字符 | 平均: {total / script_count:.1f} 字符 | 最长: {max(lens)} 字符")
 
         # 显示第一个script
         if script_count > 0:
@@ -161,24 +236,22 @@ def analyze_text_length(slides_path, speech_path):
 def clean_pdf_text(text):
     """清理PDF提取的文本"""
 
-    import re
-
     print("\n清理PDF文本...")
-    print(f"原始长度: {len(text)} 字符")
+    orig_len = len(text)
+    print(f"原始长度: {orig_len} 字符")
 
     # 1. 移除多余空白
-    text = re.sub(r'\n\s*\n', '\n\n', text)  # 多个空行变成两个
-    text = re.sub(r' +', ' ', text)  # 多个空格变成一个
+    text = _RE_WHITESPACE.sub(lambda m: '\n\n' if m.group(1) else ' ', text)
 
     # 2. 移除页眉页脚标记
-    text = re.sub(r'--- Page \d+ ---\n', '', text)
+    text = _RE_PAGE_MARK.sub('', text)
 
     # 3. 移除重复的分隔符
-    text = re.sub(r'-{3,}', '---', text)
-    text = re.sub(r'={3,}', '===', text)
+    text = _RE_DASHES.sub('---', text)
+    text = _RE_EQUALS.sub('===', text)
 
     print(f"清理后长度: {len(text)} 字符")
-    print(f"减少了: {len(text) - len(text)} 字符")
+    print(f"减少了: {orig_len - len(text)} 字符")
 
     return text
 
@@ -188,8 +261,8 @@ def save_cleaned_text(slides_text, output_path="presentation_cleaned.txt"):
 
     cleaned = clean_pdf_text(slides_text)
 
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write(cleaned)
+    with open(output_path, 'wb', buffering=IO_BUFFER_SIZE) as f:
+        f.write(cleaned.encode('utf-8'))
 
     print(f"✓ 清理后的文本已保存到: {output_path}")
     print(f"  使用方法: load_files('{output_path}', 'speech.txt')")
@@ -4,44 +4,107 @@
 """
 
 # 首先需要安装必要的库来提取PDF文本
-# pip install PyPDF2 或 pip install pdfplumber
+# pip install pypdfium2 或 pip install pdfplumber 或 pip install PyPDF2
 
+import functools
 import json
+import os
 import re
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+try:
+    from _pdfium_text import iter_pdfium_pages
+    HAS_PDFIUM = True
+except ImportError:
+    HAS_PDFIUM = False
+
+# 读写演讲稿/报告等小文件：二进制读写 + 显式UTF-8编解码，使用128KiB缓冲区
+IO_BUFFER_SIZE = 128 * 1024
+
+
+def _read_text(path):
+    """一次性读取整个文本文件"""
+    with open(path, 'rb', buffering=IO_BUFFER_SIZE) as f:
+        return f.read().decode('utf-8')
+
+
+def _write_text(path, text):
+    """一次性写入整个文本文件"""
+    with open(path, 'wb', buffering=IO_BUFFER_SIZE) as f:
+        f.write(text.encode('utf-8'))
+
+
 # 方法1: 使用 PyPDF2
 def extract_text_from_pdf_pypdf2(pdf_path):
     """使用PyPDF2提取PDF文本"""
     try:
         import PyPDF2
-        text = ""
+        parts = []
         with open(pdf_path, 'rb') as file:
             pdf_reader = PyPDF2.PdfReader(file)
             for page in pdf_reader.pages:
-                text += page.extract_text() + "\n"
-        return text
+                page_text = page.extract_text()
+                if page_text:
+                    parts.append(page_text)
+        return "\n".join(parts)
     except ImportError:
         print("请安装PyPDF2: pip install PyPDF2")
         return None
 
 
-# 方法2: 使用 pdfplumber (推荐，效果更好)
+# 方法2: 使用 pdfplumber (效果好，但逐页构建pdfminer对象树，速度较慢)
 def extract_text_from_pdf_pdfplumber(pdf_path):
     """使用pdfplumber提取PDF文本"""
     try:
         import pdfplumber
-        text = ""
+        parts = []
         with pdfplumber.open(pdf_path) as pdf:
             for page in pdf.pages:
-                text += page.extract_text() + "\n"
-        return text
+                page_text = page.extract_text()
+                if page_text:
+                    parts.append(page_text)
+        return "\n".join(parts)
     except ImportError:
         print("请安装pdfplumber: pip install pdfplumber")
         return None
 
 
-# 方法3: 使用已经提取好的文本（如果你已经有了）
+# 方法3: 使用 pypdfium2 (推荐，基于PDFium，速度最快)
+def extract_text_from_pdf_pypdfium2(pdf_path):
+    """使用pypdfium2提取PDF文本（未安装时返回None，由调用方回退到pdfplumber）"""
+    if not HAS_PDFIUM:
+        return None
+    return "\n".join(page_text for _, page_text in iter_pdfium_pages(pdf_path) if page_text)
+
+
+def extract_text_from_pdf(pdf_path):
+    """提取PDF文本：优先pypdfium2，其次pdfplumber（按路径+修改时间缓存）"""
+    return _extract_text_from_pdf_cached(pdf_path, os.path.getmtime(pdf_path))
+
+
+@functools.lru_cache(maxsize=32)
+def _extract_text_from_pdf_cached(pdf_path, pdf_mtime):
+    """
+    实际执行提取，pdf_mtime仅作为缓存键，PDF被修改后自动失效
+
+    首次提取后写入 <pdf>.txt.cache，后续运行若缓存比PDF新则直接读取，跳过PDF解析
+    """
+    cache_path = pdf_path + '.txt.cache'
+    if os.path.exists(cache_path) and os.path.getmtime(cache_path) >= pdf_mtime:
+        return _read_text(cache_path)
+
+    text = extract_text_from_pdf_pypdfium2(pdf_path)
+    if text is None:
+        text = extract_text_from_pdf_pdfplumber(pdf_path)
+    if text is None:
+        return None
+
+    _write_text(cache_path, text)
+    return text
+
+
+# 方法4: 使用已经提取好的文本（如果你已经有了）
 def use_existing_text():
     """
     如果你已经通过 window.fs.readFile 或其他方式获得了PDF文本，
@@ -67,10 +130,10 @@ def run_complete_evaluation():
 
     pdf_path = "presentation.pdf"
 
-    # 尝试使用pdfplumber（推荐）
-    pdf_text = extract_text_from_pdf_pdfplumber(pdf_path)
+    # 尝试使用pypdfium2 / pdfplumber（推荐）
+    pdf_text = extract_text_from_pdf(pdf_path)
 
-    # 如果pdfplumber不可用，尝试PyPDF2
+    # 如果pypdfium2和pdfplumber均不可用，尝试PyPDF2
     if pdf_text is None:
         pdf_text = extract_text_from_pdf_pypdf2(pdf_path)
 
@@ -96,8 +159,7 @@ misleading content—known as "hallucinations"
 
     speech_path = "speech.txt"
     try:
-        with open(speech_path, 'r', encoding='utf-8') as f:
-            speech_json = f.read()
+        speech_json = _read_text(speech_path)
         print(f"✓ 演讲稿读取成功")
     except FileNotFoundError:
         print(f"✗ 文件未找到: {speech_path}")
@@ -121,8 +183,7 @@ misleading content—known as "hallucinations"
 
     # 保存报告
     report_path = "evaluation_report.txt"
-    with open(report_path, 'w', encoding='utf-8') as f:
-        f.write(report)
+    _write_text(report_path, report)
 
     print(f"✓ 报告已保存至: {report_path}")
 
@@ -135,86 +196,121 @@ misleading content—known as "hallucinations"
 
 # ========== 批量评估多个演讲稿 ==========
 
-def batch_evaluation(pdf_path, speech_files):
+# 对比报告中分数行的列顺序
+SCORE_COLUMNS = ['overall', 'content', 'structure', 'language', 'detail', 'time']
+
+# 工作进程中共享的PDF文本，由进程池initializer设置，避免每个任务重复序列化
+_worker_pdf_text = None
+
+
+def _init_worker(pdf_text):
+    """进程池初始化：保存PDF文本到模块全局变量"""
+    global _worker_pdf_text
+    _worker_pdf_text = pdf_text
+
+
+def _eval_one(speech_file):
+    """在工作进程中评估单个演讲稿，写出单独报告并返回摘要"""
+    from speech_evaluator import SpeechEvaluator
+
+    print(f"\n评估: {speech_file}")
+    print("-" * 70)
+
+    speech_json = _read_text(speech_file)
+
+    evaluator = SpeechEvaluator(_worker_pdf_text, speech_json)
+    results = evaluator.evaluate_all()
+
+    # 保存单独的报告
+    report = evaluator.generate_report()
+    report_file = speech_file.replace('.txt', '_evaluation.txt')
+    _write_text(report_file, report)
+
+    return {
+        'file': speech_file,
+        'overall_score': results['overall_score'],
+        'grade': results['grade'],
+        'scores': {
+            'content': results['content_consistency']['overall_score'],
+            'structure': results['structure']['overall_score'],
+            'language': results['language_quality']['overall_score'],
+            'detail': results['detail_richness']['overall_score'],
+            'time': results['time_management']['overall_score']
+        }
+    }
+
+
+def batch_evaluation(pdf_path, speech_files, pdf_text=None):
     """
-    批量评估多个演讲稿
+    批量评估多个演讲稿（各文件相互独立，使用进程池并行评估）
 
     Args:
         pdf_path: PDF幻灯片路径
         speech_files: 演讲稿JSON文件列表
+        pdf_text: 已提取的PDF文本（可选，提供时不再重复解析PDF）
     """
-    from speech_evaluator import SpeechEvaluator
-
     # 提取PDF文本
-    pdf_text = extract_text_from_pdf_pdfplumber(pdf_path)
+    if pdf_text is None:
+        pdf_text = extract_text_from_pdf(pdf_path)
     if pdf_text is None:
         pdf_text = extract_text_from_pdf_pypdf2(pdf_path)
 
-    results_summary = []
-
-    for speech_file in speech_files:
-        print(f"\n评估: {speech_file}")
-        print("-" * 70)
-
-        with open(speech_file, 'r', encoding='utf-8') as f:
-            speech_json = f.read()
-
-        evaluator = SpeechEvaluator(pdf_text, speech_json)
-        results = evaluator.evaluate_all()
-
-        results_summary.append({
-            'file': speech_file,
-            'overall_score': results['overall_score'],
-            'grade': results['grade'],
-            'scores': {
-                'content': results['content_consistency']['overall_score'],
-                'structure': results['structure']['overall_score'],
-                'language': results['language_quality']['overall_score'],
-                'detail': results['detail_richness']['overall_score'],
-                'time': results['time_management']['overall_score']
-            }
-        })
-
-        # 保存单独的报告
-        report = evaluator.generate_report()
-        report_file = speech_file.replace('.txt', '_evaluation.txt')
-        with open(report_file, 'w', encoding='utf-8') as f:
-            f.write(report)
+    max_workers = min(len(speech_files), os.cpu_count() or 1) or 1
+    with ProcessPoolExecutor(max_workers=max_workers,
+                             initializer=_init_worker,
+                             initargs=(pdf_text,)) as executor:
+        futures = [executor.submit(_eval_one, speech_file) for speech_file in speech_files]
+        # 按提交顺序收集结果，保持与输入文件列表一致
+        results_summary = [future.result() for future in futures]
+
+    # 整理为与文件一一对应的分数行（列顺序同SCORE_COLUMNS）
+    files = [r['file'] for r in results_summary]
+    grades = [r['grade'] for r in results_summary]
+    score_rows = [(r['overall_score'],) + tuple(r['scores'][col] for col in SCORE_COLUMNS[1:])
+                  for r in results_summary]
 
     # 生成对比报告
-    generate_comparison_report(results_summary)
+    generate_comparison_report(files, grades, score_rows)
 
     return results_summary
 
 
-def generate_comparison_report(results_summary):
-    """生成多个演讲稿的对比报告"""
+def generate_comparison_report(files, grades, score_rows):
+    """
+    生成多个演讲稿的对比报告
+
+    Args:
+        files: 演讲稿文件名列表
+        grades: 与files对应的等级列表
+        score_rows: 与files对应的分数元组列表，列顺序同SCORE_COLUMNS
+    """
 
     report = "=" * 70 + "\n"
     report += " " * 20 + "演讲稿质量对比报告\n"
     report += "=" * 70 + "\n\n"
 
-    # 按总分排序
-    sorted_results = sorted(results_summary,
-                            key=lambda x: x['overall_score'],
-                            reverse=True)
+    # 按总分降序排序（稳定排序，同分保持原顺序）
+    order = sorted(range(len(score_rows)), key=lambda idx: score_rows[idx][0], reverse=True)
 
     report += "排名 | 文件名 | 总分 | 等级 | 内容 | 结构 | 语言 | 细节 | 时间\n"
     report += "-" * 70 + "\n"
 
-    for i, result in enumerate(sorted_results, 1):
-        scores = result['scores']
-        report += f"{i:2d}. {Path(result['file']).stem:20s} "
-        report += f"{result['overall_score']:5.1%} {result['grade']:8s} "
-        report += f"{scores['content']:5.1%} {scores['structure']:5.1%} "
-        report += f"{scores['language']:5.1%} {scores['detail']:5.1%} "
-        report += f"{scores['time']:5.1%}\n"
+    rows = []
+    for i, idx in enumerate(order, 1):
+        overall, content, structure, language, detail, time_score = score_rows[idx]
+        rows.append(
+            f"{i:2d}. {Path(files[idx]).stem:20s} "
+            f"{overall:5.1%} {grades[idx]:8s} "
+            f"{content:5.1%} {structure:5.1%} "
+            f"{language:5.1%} {detail:5.1%} "
+            f"{time_score:5.1%}\n"
+        )
+    report += "".join(rows)
 
     report += "\n" + "=" * 70 + "\n"
 
     # 保存对比报告
-    with open('comparison_report.txt', 'w', encoding='utf-8') as f:
-        f.write(report)
+    _write_text('comparison_report.txt', report)
 
     print(report)
     print("对比报告已保存至: comparison_report.txt")
@@ -222,7 +318,7 @@ def generate_comparison_report(results_summary):
 
 # ========== 详细的评估指标导出 ==========
 
-def export_detailed_metrics(pdf_path, speech_path, output_format='json'):
+def export_detailed_metrics(pdf_path, speech_path, output_format='json', pdf_text=None):
     """
     导出详细的评估指标
 
@@ -230,13 +326,14 @@ def export_detailed_metrics(pdf_path, speech_path, output_format='json'):
         pdf_path: PDF路径
         speech_path: 演讲稿路径
         output_format: 输出格式 ('json', 'csv', 'excel')
+        pdf_text: 已提取的PDF文本（可选，提供时不再重复解析PDF）
     """
     from speech_evaluator import SpeechEvaluator
 
     # 提取和评估
-    pdf_text = extract_text_from_pdf_pdfplumber(pdf_path)
-    with open(speech_path, 'r', encoding='utf-8') as f:
-        speech_json = f.read()
+    if pdf_text is None:
+        pdf_text = extract_text_from_pdf(pdf_path)
+    speech_json = _read_text(speech_path)
 
     evaluator = SpeechEvaluator(pdf_text, speech_json)
     results = evaluator.evaluate_all()
@@ -253,16 +350,16 @@ def export_detailed_metrics(pdf_path, speech_path, output_format='json'):
         import csv
         output_file = 'evaluation_metrics.csv'
 
-        with open(output_file, 'w', newline='', encoding='utf-8-sig') as f:
-            writer = csv.writer(f)
-            writer.writerow(['维度', '子指标', '得分'])
+        rows = [['维度', '子指标', '得分']]
+        for dimension, data in results.items():
+            if dimension in ('overall_score', 'grade', 'weights'):
+                continue
+            for metric, score in data.items():
+                if metric != 'overall_score':
+                    rows.append([dimension, metric, f"{score:.2%}" if isinstance(score, float) else score])
 
-            for dimension, data in results.items():
-                if dimension in ['overall_score', 'grade', 'weights']:
-                    continue
-                for metric, score in data.items():
-                    if metric != 'overall_score':
-                        writer.writerow([dimension, metric, f"{score:.2%}" if isinstance(score, float) else score])
+        with open(output_file, 'w', newline='', encoding='utf-8-sig', buffering=IO_BUFFER_SIZE) as f:
+            csv.writer(f).writerows(rows)
 
         print(f"✓ 指标已导出至: {output_file}")
 
@@ -274,9 +371,15 @@ def export_detailed_metrics(pdf_path, speech_path, output_format='json'):
 if __name__ == "__main__":
 
 
+    pdf_path = 'presentation.pdf'
+    # 只解析一次PDF，后续评估共享同一份文本
+    pdf_text = extract_text_from_pdf(pdf_path)
+    if pdf_text is None:
+        pdf_text = extract_text_from_pdf_pypdf2(pdf_path)
+
     speech_files = ['speech_qwen_vl.txt', 'speech_gemini.txt']
-    batch_evaluation('presentation.pdf', speech_files)
-    export_detailed_metrics('presentation.pdf', 'speech_qwen_vl.txt', 'json')
-    export_detailed_metrics('presentation.pdf', 'speech_gemini.txt', 'json')
+    batch_evaluation(pdf_path, speech_files, pdf_text=pdf_text)
+    export_detailed_metrics(pdf_path, 'speech_qwen_vl.txt', 'json', pdf_text=pdf_text)
+    export_detailed_metrics(pdf_path, 'speech_gemini.txt', 'json', pdf_text=pdf_text)
 
 
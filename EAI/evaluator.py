@@ -5,45 +5,154 @@
 输出：ROUGE-L、BERTScore、GPTScore评估结果
 """
 
+import functools
+import io
 import json
-import pdfplumber
-from typing import Dict, List
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import IO, Dict, Iterator, List, Tuple
 import warnings
-from rouge_score import rouge_scorer
+from nltk.stem import porter
+from rouge_score import rouge_scorer, tokenizers
+from rouge_score import tokenize as rouge_tokenize
 # from bert_score import score as bert_score
 warnings.filterwarnings('ignore')
 from openai import OpenAI
 HAS_OPENAI = True
 
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+try:
+    import numba
+    import numpy as np
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+try:
+    from _pdfium_text import iter_pdfium_pages
+    HAS_PDFIUM = True
+except ImportError:
+    import pdfplumber
+    HAS_PDFIUM = False
+
+# pdfplumber回退路径下，页数达到该值才启用多进程提取（进程启动有固定开销）
+PARALLEL_MIN_PAGES = 16
+
+
+def _extract_pages_pdfplumber(pdf_path: str, start: int, stop: int) -> List[str]:
+    """工作进程：独立打开PDF并提取[start, stop)页的文本"""
+    texts = []
+    with pdfplumber.open(pdf_path) as pdf:
+        for i in range(start, stop):
+            page = pdf.pages[i]
+            texts.append(page.extract_text() or "")
+            page.close()
+    return texts
+
+
 def extract_text_from_pdf(pdf_path: str) -> str:
-    """从PDF中提取所有文本内容"""
+    """从PDF中提取所有文本内容（按路径+修改时间缓存）"""
     try:
-        with pdfplumber.open(pdf_path) as pdf:
-            text_content = []
+        pdf_mtime = os.path.getmtime(pdf_path)
+    except OSError as e:
+        print(f"PDF读取错误: {e}")
+        return ""
+    return _extract_text_from_pdf_cached(pdf_path, pdf_mtime)
 
-            for page_num, page in enumerate(pdf.pages, start=1):
-                text = page.extract_text()
-                if text and text.strip():
-                    text_content.append(f"--- 第{page_num}页 ---\n{text}")
 
-            return "\n\n".join(text_content)
+@functools.lru_cache(maxsize=32)
+def _extract_text_from_pdf_cached(pdf_path: str, pdf_mtime: float) -> str:
+    """实际执行提取，pdf_mtime仅作为缓存键，PDF被修改后自动失效"""
+    try:
+        buf = io.StringIO()
+        extract_text_from_pdf_stream(pdf_path, buf)
+        return buf.getvalue()
     except Exception as e:
         print(f"PDF读取错误: {e}")
         return ""
 
 
+def extract_text_from_pdf_stream(pdf_path: str, out: IO[str]) -> None:
+    """
+    逐页提取PDF文本并直接写入out（StringIO或已打开的文本文件）
+
+    输出格式与 extract_text_from_pdf 相同，但不会同时在内存中保留所有页面，适合超大PDF
+    """
+    first = True
+    for page_num, text in iter_pdf_pages(pdf_path):
+        if not text.strip():
+            continue
+        if not first:
+            out.write("\n\n")
+        out.write(f"--- 第{page_num}页 ---\n{text}")
+        first = False
+
+
+def iter_pdf_pages(pdf_path: str) -> Iterator[Tuple[int, str]]:
+    """按页依次产出 (页码, 页面文本)，页码从1开始"""
+    if HAS_PDFIUM:
+        yield from iter_pdfium_pages(pdf_path)
+        return
+
+    with pdfplumber.open(pdf_path) as pdf:
+        num_pages = len(pdf.pages)
+        if num_pages < PARALLEL_MIN_PAGES:
+            for page_num, page in enumerate(pdf.pages, start=1):
+                text = page.extract_text() or ""
+                # 释放该页解析出的对象，避免大文档内存持续增长
+                page.close()
+                yield page_num, text
+            return
+
+    # pdfplumber为纯Python且同一文档的页面共享文件句柄，
+    # 因此按页码区间分给多个进程，各自独立打开PDF
+    workers = min(8, os.cpu_count() or 1, num_pages)
+    chunk = -(-num_pages // workers)
+    starts = list(range(0, num_pages, chunk))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        chunks = executor.map(_extract_pages_pdfplumber,
+                              [pdf_path] * len(starts),
+                              starts,
+                              [min(start + chunk, num_pages) for start in starts])
+        page_num = 1
+        for part in chunks:
+            for text in part:
+                yield page_num, text
+                page_num += 1
+
+
+def _loads_json(content):
+    """解析JSON，优先使用orjson（支持bytes/str），失败时抛出ValueError"""
+    if HAS_ORJSON:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
 def load_speech_json(json_path: str) -> Dict:
     """加载JSON格式的演讲稿"""
     try:
-        with open(json_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-            # 处理可能包含```json```标记的情况
-            if '```json' in content:
-                content = content.split('```json')[1].split('```')[0].strip()
-            elif '```' in content:
-                content = content.split('```')[1].split('```')[0].strip()
-
-            return json.loads(content)
+        with open(json_path, 'rb') as f:
+            raw = f.read()
+
+        # 快速路径：文件本身就是合法JSON，无需扫描markdown标记
+        try:
+            return _loads_json(raw)
+        except ValueError:
+            pass
+
+        content = raw.decode('utf-8')
+        # 处理可能包含```json```标记的情况
+        if '```json' in content:
+            content = content.split('```json')[1].split('```')[0].strip()
+        elif '```' in content:
+            content = content.split('```')[1].split('```')[0].strip()
+
+        return _loads_json(content)
     except Exception as e:
         print(f"JSON读取错误: {e}")
         return {}
@@ -61,10 +170,110 @@ def extract_speech_text(speech_data: Dict) -> str:
     return "\n\n".join(speech_texts)
 
 
-def evaluate_rouge_l(reference: str, generated: str) -> Dict[str, float]:
-    """计算ROUGE-L分数"""
-    scorer = rouge_scorer.RougeScorer(['rougeL'], use_stemmer=True)
-    scores = scorer.score(reference, generated)
+if HAS_NUMBA:
+    @numba.njit(cache=True)
+    def _lcs_length(a, b):
+        """两行滚动数组计算最长公共子序列长度"""
+        m = len(b)
+        prev = np.zeros(m + 1, np.int32)
+        curr = np.zeros(m + 1, np.int32)
+        for i in range(len(a)):
+            ai = a[i]
+            for j in range(m):
+                if ai == b[j]:
+                    curr[j + 1] = prev[j] + 1
+                elif prev[j + 1] >= curr[j]:
+                    curr[j + 1] = prev[j + 1]
+                else:
+                    curr[j + 1] = curr[j]
+            prev, curr = curr, prev
+        return prev[m]
+
+
+class _CachedStemTokenizer(tokenizers.Tokenizer):
+    """与rouge_score默认分词一致，但每个词的Porter词干只计算一次（进程内缓存）"""
+
+    def __init__(self):
+        self.stem = functools.lru_cache(maxsize=200000)(porter.PorterStemmer().stem)
+
+    def tokenize(self, text):
+        # rouge_score.tokenize只调用stemmer.stem，这里把自身作为stemmer传入
+        return rouge_tokenize.tokenize(text, self)
+
+
+# 模块级复用，避免每次评估都重新初始化词干提取器（进程池中每个进程各持有一份）
+_rouge_tokenizer = _CachedStemTokenizer()
+_rouge_scorer = rouge_scorer.RougeScorer(['rougeL'], tokenizer=_rouge_tokenizer)
+
+
+# 分词结果到int32 id的映射，在多次评估之间共享，保证同一词元的id一致
+_rouge_vocab = {}
+
+
+def _token_ids(text: str) -> "np.ndarray":
+    """与rouge_score相同的分词（含词干提取），并映射为int32 id数组"""
+    return np.array([_rouge_vocab.setdefault(t, len(_rouge_vocab))
+                     for t in _rouge_tokenizer.tokenize(text)], dtype=np.int32)
+
+
+def precompute_reference(reference: str) -> "np.ndarray":
+    """
+    预先处理参考文本（幻灯片内容），同一份幻灯片与多份演讲稿比较时只需分词一次
+
+    需要安装numba，返回值传给 evaluate_rouge_l_ids
+    """
+    return _token_ids(reference)
+
+
+def evaluate_rouge_l_ids(reference_ids: "np.ndarray", generated: str) -> Dict[str, float]:
+    """使用预处理好的参考文本id数组计算ROUGE-L分数，LCS部分使用numba编译的内核"""
+    gen_ids = _token_ids(generated)
+
+    if len(reference_ids) == 0 or len(gen_ids) == 0:
+        return {'precision': 0.0, 'recall': 0.0, 'fmeasure': 0.0}
+
+    lcs = int(_lcs_length(reference_ids, gen_ids))
+    precision = lcs / len(gen_ids)
+    recall = lcs / len(reference_ids)
+    fmeasure = 2 * precision * recall / (precision + recall) if precision + recall > 0 else 0.0
+
+    return {
+        'precision': precision,
+        'recall': recall,
+        'fmeasure': fmeasure
+    }
+
+
+# 同一参考文本重复评估时直接复用id数组
+_cached_reference_ids = functools.lru_cache(maxsize=8)(precompute_reference)
+
+
+def _truncate_tokens(text: str, max_tokens: int) -> str:
+    """按空白切分后只保留前max_tokens个词，None表示不截断"""
+    if max_tokens is None:
+        return text
+    words = text.split()
+    if len(words) <= max_tokens:
+        return text
+    return " ".join(words[:max_tokens])
+
+
+def evaluate_rouge_l(reference: str, generated: str,
+                     max_ref_tokens: int = 4000,
+                     max_gen_tokens: int = 4000) -> Dict[str, float]:
+    """
+    计算ROUGE-L分数
+
+    LCS为O(n·m)，参考文本和演讲稿分别截断到max_ref_tokens/max_gen_tokens个词，
+    召回率基于截断后的参考文本计算；传入None则不截断
+    """
+    reference = _truncate_tokens(reference, max_ref_tokens)
+    generated = _truncate_tokens(generated, max_gen_tokens)
+
+    if HAS_NUMBA:
+        return evaluate_rouge_l_ids(_cached_reference_ids(reference), generated)
+
+    scores = _rouge_scorer.score(reference, generated)
     rouge_l = scores['rougeL']
 
     return {
@@ -85,6 +294,49 @@ def evaluate_rouge_l(reference: str, generated: str) -> Dict[str, float]:
 #     }
 
 
+GPT_ASPECTS = {
+    'overall': 'Overall Quality (content coverage, logical coherence, language fluency)',
+    'coherence': 'Logical Coherence (clear reasoning, well-structured)',
+    'relevance': 'Content Relevance (match with slide content)',
+    'fluency': 'Language Fluency (natural expression, easy to understand)'
+}
+
+# 发送给GPT的幻灯片内容和演讲稿各自的最大字符数
+GPT_MAX_CHARS = 2000
+
+# 合并请求的回复token上限：四个维度各保留原先单独请求时的300，避免回复被截断成无效JSON
+GPT_MAX_TOKENS = 300 * len(GPT_ASPECTS)
+
+# GPT评估prompt的固定部分，只有幻灯片内容和演讲稿两处需要在调用时插入
+GPT_PROMPT_PREFIX = (
+    "As a professional speech evaluation expert, please evaluate the following speech script "
+    "on each of these aspects:\n"
+    + "\n".join(f"- {aspect}: {description}" for aspect, description in GPT_ASPECTS.items())
+    + "\n\n【Slide Reference Content】\n"
+)
+GPT_PROMPT_MIDDLE = "\n\n【Generated Speech Script】\n"
+GPT_PROMPT_SUFFIX = """
+
+For each aspect, rate the speech script from 1-10 (10 being the highest) and provide brief feedback.
+
+Output in JSON format:
+{
+    "overall": {"score": <score from 1-10>, "feedback": "<brief evaluation>"},
+    "coherence": {"score": <score from 1-10>, "feedback": "<brief evaluation>"},
+    "relevance": {"score": <score from 1-10>, "feedback": "<brief evaluation>"},
+    "fluency": {"score": <score from 1-10>, "feedback": "<brief evaluation>"}
+}
+"""
+
+
+@functools.lru_cache(maxsize=4)
+def _get_client(api_key: str, base_url: str = None) -> "OpenAI":
+    """按 (api_key, base_url) 复用OpenAI客户端，保持HTTP连接池和keep-alive"""
+    if base_url:
+        return OpenAI(api_key=api_key, base_url=base_url)
+    return OpenAI(api_key=api_key)
+
+
 def evaluate_gpt_score(reference: str, generated: str,
                        openai_api_key: str = None,
                        openai_base_url: str = None) -> Dict:
@@ -108,62 +360,59 @@ def evaluate_gpt_score(reference: str, generated: str,
         }
 
     try:
-        if openai_base_url:
-            client = OpenAI(api_key=openai_api_key, base_url=openai_base_url)
-        else:
-            client = OpenAI(api_key=openai_api_key)
+        client = _get_client(openai_api_key, openai_base_url)
 
         results = {}
-        aspects = {
-            'overall': 'Overall Quality (content coverage, logical coherence, language fluency)',
-            'coherence': 'Logical Coherence (clear reasoning, well-structured)',
-            'relevance': 'Content Relevance (match with slide content)',
-            'fluency': 'Language Fluency (natural expression, easy to understand)'
-        }
-
-        for aspect, description in aspects.items():
-            prompt = f"""As a professional speech evaluation expert, please evaluate the {description} of the following speech script.
-
-【Slide Reference Content】
-{reference[:2000]}  # 限制长度避免token超限
-
-【Generated Speech Script】
-{generated[:2000]}
-
-Please rate the speech script from 1-10 (10 being the highest) and provide brief feedback.
-
-Output in JSON format:
-{{
-    "score": <score from 1-10>,
-    "feedback": "<brief evaluation>"
-}}
-"""
-
-            response = client.chat.completions.create(
-                model="qwen-vl-plus",
-                messages=[
-                    {"role": "system", "content": "You are a professional speech evaluation expert."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.3,
-                max_tokens=300
-            )
-
-            result_text = response.choices[0].message.content.strip()
-
-            try:
-                if '```json' in result_text:
-                    result_text = result_text.split('```json')[1].split('```')[0].strip()
-                elif '```' in result_text:
-                    result_text = result_text.split('```')[1].split('```')[0].strip()
-
-                result = json.loads(result_text)
+        aspects = GPT_ASPECTS
+
+        # 截断参考内容和演讲稿，避免token超限（只截取一次）
+        ref_short = reference[:GPT_MAX_CHARS]
+        gen_short = generated[:GPT_MAX_CHARS]
+
+        # 四个维度合并为一次请求，参考内容只发送一次；模板固定部分已在模块级预先拼好
+        prompt = "".join((GPT_PROMPT_PREFIX, ref_short,
+                          GPT_PROMPT_MIDDLE, gen_short,
+                          GPT_PROMPT_SUFFIX))
+
+        response = client.chat.completions.create(
+            model="qwen-vl-plus",
+            messages=[
+                {"role": "system", "content": "You are a professional speech evaluation expert."},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.3,
+            max_tokens=GPT_MAX_TOKENS,
+            response_format={"type": "json_object"}
+        )
+
+        result_text = response.choices[0].message.content.strip()
+
+        try:
+            if '```json' in result_text:
+                result_text = result_text.split('```json')[1].split('```')[0].strip()
+            elif '```' in result_text:
+                result_text = result_text.split('```')[1].split('```')[0].strip()
+
+            parsed = json.loads(result_text)
+        except (ValueError, IndexError):
+            parsed = None
+
+        for aspect in aspects:
+            result = parsed.get(aspect) if isinstance(parsed, dict) else None
+            score = None
+            if isinstance(result, dict):
+                # 模型偶尔把分数写成字符串或null，逐项转换，失败只影响该项
+                try:
+                    score = float(result.get('score', 0))
+                except (TypeError, ValueError):
+                    score = None
+            if score is not None:
                 results[aspect] = {
-                    'score': result.get('score', 0) / 10.0,
+                    'score': score / 10.0,
                     'raw_score': result.get('score', 0),
                     'feedback': result.get('feedback', '')
                 }
-            except:
+            else:
                 results[aspect] = {
                     'score': None,
                     'raw_score': None,
@@ -186,8 +435,13 @@ def comprehensive_evaluation(pdf_path: str, json_path: str,
                              use_gpt: bool = False,
                              openai_api_key: str = None,
                              openai_base_url: str = None,
-                             lang: str = 'en') -> Dict:
-    """综合评估"""
+                             lang: str = 'en',
+                             gpt_min_rouge: float = None) -> Dict:
+    """
+    综合评估
+
+    gpt_min_rouge: ROUGE-L F值低于该阈值时直接跳过GPT评估（节省API调用），None表示总是评估
+    """
     print("=" * 70)
     print("演讲稿质量评估系统")
     print("=" * 70)
@@ -225,7 +479,12 @@ def comprehensive_evaluation(pdf_path: str, json_path: str,
 
     # 5. GPTScore评估
     gpt_scores = None
-    if use_gpt and openai_api_key:
+    if (use_gpt and openai_api_key and gpt_min_rouge is not None
+            and rouge_scores['fmeasure'] < gpt_min_rouge):
+        reason = f"ROUGE-L F值 {rouge_scores['fmeasure']:.4f} 低于阈值 {gpt_min_rouge}"
+        print(f"\n[5/5] 跳过GPTScore评估（{reason}）")
+        gpt_scores = {'skipped': reason}
+    elif use_gpt and openai_api_key:
         print("\n[5/5] 使用GPT进行质量评估...")
         gpt_scores = evaluate_gpt_score(slide_content, speech_text,
                                         openai_api_key, openai_base_url)
@@ -271,7 +530,9 @@ def print_evaluation_report(results: Dict):
         print("\n【3. GPTScore - 语义质量评估】")
         gpt_scores = results['gpt_score']
 
-        if 'error' in gpt_scores:
+        if 'skipped' in gpt_scores:
+            print(f"  已跳过: {gpt_scores['skipped']}")
+        elif 'error' in gpt_scores:
             print(f"  错误: {gpt_scores['error']}")
         else:
             aspect_names = {
@@ -331,8 +592,12 @@ def main():
 
     # 保存结果
     output_path = "rouge_score_gemini.json"
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(results, f, ensure_ascii=False, indent=2)
+    if HAS_ORJSON:
+        with open(output_path, 'wb') as f:
+            f.write(orjson.dumps(results, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+    else:
+        with open(output_path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
     print(f"评估结果已保存到: {output_path}\n")
 
 
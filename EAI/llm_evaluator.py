@@ -3,78 +3,34 @@
 Speech Evaluation System with Qwen VL Plus API
 """
 
+import io
 import json
 import re
-import time
+from pathlib import Path
 from typing import Dict, Optional
-import openai
 
+from _speech_cache import SpeechCache
+from qwen_client import get_client, stream_progress
 
-class QwenVLPlus:
-    """Qwen VL Plus API 封装"""
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
 
-    def __init__(self, api_key):
-        self.model = "qwen-vl-plus"
-        self.llm = openai.OpenAI(
-            api_key=api_key,
-            base_url="https://dashscope.aliyuncs.com/compatible-mode/v1"
-        )
+# 去掉包裹JSON的markdown代码块标记（结尾的```缺失时也能匹配）
+_FENCE_RE = re.compile(r'^\s*```(?:json)?\s*(.*?)\s*(?:```\s*)?$', re.DOTALL)
 
-    def _cons_kwargs(self, messages: list[dict]) -> dict:
-        kwargs = {
-            "model": self.model,
-            "messages": messages,
-            "temperature": 0.3,
-            "timeout": 60,
-        }
-        return kwargs
-
-    def completion(self, messages: list[dict], enable_thinking=False, return_json=False) -> dict:
-        response_format = {"type": "json_object"} if not enable_thinking and return_json else {"type": "text"}
-        extra_body = {"enable_thinking": enable_thinking}
-
-        try:
-            rsp = self.llm.chat.completions.create(
-                **self._cons_kwargs(messages),
-                extra_body=extra_body,
-                response_format=response_format
-            )
-        except openai.RateLimitError as e:
-            print("⚠️  API请求超过速率限制,等待60秒后重试...")
-            time.sleep(60)
-            rsp = self.llm.chat.completions.create(
-                **self._cons_kwargs(messages),
-                extra_body=extra_body,
-                response_format=response_format
-            )
-        except openai.APITimeoutError as e:
-            print("⚠️  API请求超时,等待60秒后重试...")
-            time.sleep(60)
-            rsp = self.llm.chat.completions.create(
-                **self._cons_kwargs(messages),
-                extra_body=extra_body,
-                response_format=response_format
-            )
-
-        return rsp.choices[0].message.content
-
-
-class QwenSpeechEvaluator:
-    """使用Qwen API的演讲稿评估器"""
 
-    def __init__(self, api_key: str):
-        """
-        初始化评估器
-
-        Args:
-            api_key: 阿里云DashScope API密钥
-        """
-        self.qwen = QwenVLPlus(api_key)
+def _loads_json(content):
+    """解析JSON，优先使用orjson；失败时抛出json.JSONDecodeError"""
+    if HAS_ORJSON:
+        return orjson.loads(content)
+    return json.loads(content)
 
-    def build_evaluation_prompt(self, slides_text: str, speech_json: str) -> str:
-        """构建评估prompt"""
 
-        prompt = """你是一名专业的演讲质量评估专家，擅长评估根据幻灯片生成的演讲规划和演讲稿的质量。
+# 评估prompt的固定部分，幻灯片内容和演讲稿插在中间，拼接时只分配一次
+EVAL_PROMPT_PREFIX = """你是一名专业的演讲质量评估专家，擅长评估根据幻灯片生成的演讲规划和演讲稿的质量。
 你将接收到一些信息，包括：
 1. 幻灯片内容
 2. 不同系统生成的“演讲规划”（plan）和“演讲稿”（script）
@@ -113,18 +69,32 @@ overall_score = (plan_total + script_total) / 2
 # 幻灯片内容
 
 """
-        prompt += slides_text
-        prompt += """
+EVAL_PROMPT_MIDDLE = """
 
 # 生成的演讲稿
 
 """
-        prompt += speech_json
-        prompt += """
+EVAL_PROMPT_SUFFIX = "\n\n"
 
-"""
 
-        return prompt
+class QwenSpeechEvaluator:
+    """使用Qwen API的演讲稿评估器"""
+
+    def __init__(self, api_key: str, cache_path: str = ".llm_eval_cache.json"):
+        """
+        初始化评估器
+
+        Args:
+            api_key: 阿里云DashScope API密钥
+            cache_path: 评估结果缓存文件路径（按模型+prompt缓存原始回复），传None关闭缓存
+        """
+        self.qwen = get_client(api_key)
+        self.cache = SpeechCache(cache_path) if cache_path else None
+
+    def build_evaluation_prompt(self, slides_text: str, speech_json: str) -> str:
+        """构建评估prompt"""
+
+        return "".join((EVAL_PROMPT_PREFIX, slides_text, EVAL_PROMPT_MIDDLE, speech_json, EVAL_PROMPT_SUFFIX))
 
     def evaluate_speech(self, slides_text: str, speech_json: str) -> Optional[Dict]:
         """
@@ -157,23 +127,34 @@ overall_score = (plan_total + script_total) / 2
             }
         ]
 
-        # 调用API
+        # 调用API（相同的幻灯片和演讲稿直接使用缓存的回复）
         print("步骤2: 调用Qwen API...")
-        print("(这可能需要1-2分钟)")
-
-        try:
-            response_text = self.qwen.completion(
-                messages=messages,
-                enable_thinking=False,
-                return_json=True  # 要求返回JSON格式
-            )
+        key = response_text = None
+        if self.cache is not None:
+            key = SpeechCache.make_key([self.qwen.model.encode('utf-8')], prompt)
+            response_text = self.cache.get(key)
 
-            print("✓ API调用成功")
+        if response_text is not None:
+            print("✓ 命中缓存,跳过API调用")
             print()
-
-        except Exception as e:
-            print(f"✗ API调用失败: {e}")
-            return None
+            key = None  # 已在缓存中，无需再次写入
+        else:
+            print("(这可能需要1-2分钟)")
+            try:
+                response_text = self.qwen.completion(
+                    messages=messages,
+                    enable_thinking=False,
+                    return_json=True,  # 要求返回JSON格式
+                    stream=True,  # 流式接收，显示生成进度
+                    on_delta=stream_progress()
+                )
+
+                print("\n✓ API调用成功")
+                print()
+
+            except Exception as e:
+                print(f"✗ API调用失败: {e}")
+                return None
 
         # 解析响应
         print("步骤3: 解析响应...")
@@ -182,6 +163,10 @@ overall_score = (plan_total + script_total) / 2
         if result:
             print("✓ 解析成功")
             print()
+            # 只缓存能成功解析的回复
+            if key is not None:
+                self.cache.set(key, response_text)
+                self.cache.flush()
         else:
             print("✗ 解析失败")
             print()
@@ -192,22 +177,16 @@ overall_score = (plan_total + script_total) / 2
         """解析API响应"""
 
         try:
-            # 清理响应文本
-            cleaned = response_text.strip()
-
-            # 移除可能的markdown标记
-            if cleaned.startswith('```json'):
-                cleaned = cleaned[7:]
-            elif cleaned.startswith('```'):
-                cleaned = cleaned[3:]
-
-            if cleaned.endswith('```'):
-                cleaned = cleaned[:-3]
-
-            cleaned = cleaned.strip()
+            # 设置了json_object时模型通常直接返回合法JSON，先直接解析
+            try:
+                return _loads_json(response_text)
+            except json.JSONDecodeError:
+                pass
 
-            # 解析JSON
-            result = json.loads(cleaned)
+            # 移除可能的markdown标记后再解析（orjson.JSONDecodeError是json.JSONDecodeError的子类）
+            match = _FENCE_RE.match(response_text)
+            cleaned = match.group(1) if match else response_text.strip()
+            result = _loads_json(cleaned)
 
             # # 验证必要字段
             # if 'dimensions' not in result or 'overall' not in result:
@@ -230,33 +209,32 @@ overall_score = (plan_total + script_total) / 2
         if not result:
             return "评估失败,无法生成报告"
 
-        lines = []
-        lines.append("=" * 80)
-        lines.append(" " * 20 + "Qwen API 演讲稿质量评估报告")
-        lines.append("=" * 80)
-        lines.append("")
+        rule = "=" * 80
+        dash = "-" * 80
+        buf = io.StringIO()
+        w = buf.write
 
         # 总体评估
         overall = result.get('overall', {})
-        lines.append("【总体评估】")
-        lines.append("-" * 80)
         score = overall.get('weighted_score', 0)
         grade = overall.get('grade', 'N/A')
-        lines.append(f"综合得分: {score:.1f}/10")
-        lines.append(f"等级: {grade}")
-        lines.append("")
+        w(f"""{rule}
+{" " * 20}Qwen API 演讲稿质量评估报告
+{rule}
+
+【总体评估】
+{dash}
+综合得分: {score:.1f}/10
+等级: {grade}
+
+""")
 
         summary = overall.get('summary', '')
         if summary:
-            lines.append(f"总体评价:")
-            lines.append(f"{summary}")
-            lines.append("")
+            w(f"总体评价:\n{summary}\n\n")
 
         # 各维度评分
-        lines.append("=" * 80)
-        lines.append("【维度详细评分】")
-        lines.append("=" * 80)
-        lines.append("")
+        w(f"{rule}\n【维度详细评分】\n{rule}\n\n")
 
         dimensions = result.get('dimensions', {})
         dim_names = {
@@ -271,47 +249,36 @@ overall_score = (plan_total + script_total) / 2
             dim_data = dimensions.get(dim_key, {})
             dim_score = dim_data.get('score', 0)
 
-            lines.append(f"【{dim_name}】权重:{weight}% | 得分:{dim_score:.1f}/10")
-            lines.append("-" * 80)
+            w(f"【{dim_name}】权重:{weight}% | 得分:{dim_score:.1f}/10\n{dash}\n")
 
             # 分析
             analysis = dim_data.get('analysis', '')
             if analysis:
-                lines.append(f"{analysis}")
-                lines.append("")
+                w(f"{analysis}\n\n")
 
             # 优点
             strengths = dim_data.get('strengths', [])
             if strengths:
-                lines.append("✓ 优点:")
-                for s in strengths:
-                    lines.append(f"  • {s}")
-                lines.append("")
+                w("✓ 优点:\n")
+                w("".join(f"  • {s}\n" for s in strengths))
+                w("\n")
 
             # 不足
             weaknesses = dim_data.get('weaknesses', [])
             if weaknesses:
-                lines.append("✗ 不足:")
-                for w in weaknesses:
-                    lines.append(f"  • {w}")
-                lines.append("")
+                w("✗ 不足:\n")
+                w("".join(f"  • {s}\n" for s in weaknesses))
+                w("\n")
 
         # 改进建议
-        lines.append("=" * 80)
-        lines.append("【改进建议】")
-        lines.append("=" * 80)
-        lines.append("")
+        w(f"{rule}\n【改进建议】\n{rule}\n\n")
 
         improvements = overall.get('improvements', [])
-        for i, imp in enumerate(improvements, 1):
-            lines.append(f"{i}. {imp}")
-            lines.append("")
+        w("".join(f"{i}. {imp}\n\n" for i, imp in enumerate(improvements, 1)))
 
-        lines.append("=" * 80)
-        lines.append("评估完成!")
-        lines.append("=" * 80)
+        w(f"{rule}\n评估完成!\n{rule}")
 
-        return '\n'.join(lines)
+        return buf.getvalue()
 
 
 # ============ 工具函数 ============
@@ -325,7 +292,41 @@ def extract_text_from_pdf(pdf_path: str) -> Optional[str]:
     text = None
     errors = []
 
-    # 尝试方法1: pdfplumber
+    # 尝试方法1: pypdfium2（基于PDFium的C++实现，纯文本提取比pdfplumber快得多）
+    try:
+        from _pdfium_text import iter_pdfium_pages
+        print("✓ pypdfium2 已找到,开始提取...")
+
+        # 扫描版PDF没有文本层，安装了pytesseract时对这些页做OCR
+        try:
+            import pytesseract
+        except ImportError:
+            pytesseract = None
+        ocr = None
+        if pytesseract is not None:
+            ocr = lambda page: pytesseract.image_to_string(page.render(scale=2).to_pil(), lang='chi_sim+eng')
+
+        parts = []
+        for i, page_text in iter_pdfium_pages(pdf_path, ocr=ocr):
+            if page_text:
+                parts.append(f"\n--- Page {i} ---\n{page_text}\n")
+            print(f"  处理第 {i} 页...", end="\r")
+
+        text = "".join(parts)
+        print(f"\n✓ pypdfium2 提取成功 ({len(text)} 字符)     ")
+        return text
+
+    except ImportError as e:
+        error_msg = f"pypdfium2导入失败: {e}"
+        print(f"✗ {error_msg}")
+        errors.append(error_msg)
+    except Exception as e:
+        text = None
+        error_msg = f"pypdfium2提取失败: {e}"
+        print(f"✗ {error_msg}")
+        errors.append(error_msg)
+
+    # 尝试方法2: pdfplumber
     try:
         import pdfplumber
         print("✓ pdfplumber 已找到,开始提取...")
@@ -350,7 +351,7 @@ def extract_text_from_pdf(pdf_path: str) -> Optional[str]:
         print(f"✗ {error_msg}")
         errors.append(error_msg)
 
-    # 尝试方法2: PyPDF2
+    # 尝试方法3: PyPDF2
     if text is None:
         try:
             import PyPDF2
@@ -379,35 +380,38 @@ def extract_text_from_pdf(pdf_path: str) -> Optional[str]:
 
     # 所有方法都失败
     if text is None:
-        print("\n" + "=" * 80)
-        print("⚠️  PDF文本提取失败")
-        print("=" * 80)
-        print("\n错误信息:")
-        for i, err in enumerate(errors, 1):
-            print(f"  {i}. {err}")
-
-        print("\n【解决方案】")
-        print("-" * 80)
-
-        print("\n方案1: 安装PDF库")
-        print("  在命令行运行以下命令之一:")
         import sys
-        print(f"    {sys.executable} -m pip install pdfplumber")
-        print("  或")
-        print(f"    {sys.executable} -m pip install PyPDF2")
-
-        print("\n方案2: 手动提取文本")
-        print("  1. 用PDF阅读器打开文件")
-        print("  2. 选择所有文本 (Ctrl+A)")
-        print("  3. 复制 (Ctrl+C)")
-        print("  4. 粘贴到文本文件并保存为 presentation_text.txt")
-        print("  5. 使用文本文件代替PDF:")
-        print('     load_files("presentation_text.txt", "speech.txt")')
-
-        print("\n方案3: 运行诊断工具")
-        print("  python pdf_diagnostic.py")
-
-        print("=" * 80)
+        error_lines = "\n".join(f"  {i}. {err}" for i, err in enumerate(errors, 1))
+        print(f"""
+{"=" * 80}
+⚠️  PDF文本提取失败
+{"=" * 80}
+
+错误信息:
+{error_lines}
+
+【解决方案】
+{"-" * 80}
+
+方案1: 安装PDF库
+  在命令行运行以下命令之一:
+    {sys.executable} -m pip install pypdfium2
+  或
+    {sys.executable} -m pip install pdfplumber
+  或
+    {sys.executable} -m pip install PyPDF2
+
+方案2: 手动提取文本
+  1. 用PDF阅读器打开文件
+  2. 选择所有文本 (Ctrl+A)
+  3. 复制 (Ctrl+C)
+  4. 粘贴到文本文件并保存为 presentation_text.txt
+  5. 使用文本文件代替PDF:
+     load_files("presentation_text.txt", "speech.txt")
+
+方案3: 运行诊断工具
+  python pdf_diagnostic.py
+{"=" * 80}""")
 
     return text
 
@@ -421,13 +425,11 @@ def load_files(slides_path: str, speech_path: str) -> tuple:
         if slides_text is None:
             return None, None
     else:
-        with open(slides_path, 'r', encoding='utf-8') as f:
-            slides_text = f.read()
+        slides_text = Path(slides_path).read_bytes().decode('utf-8')
         print(f"✓ 文本文件加载成功: {len(slides_text)} 字符")
 
     # 读取演讲稿
-    with open(speech_path, 'r', encoding='utf-8') as f:
-        speech_json = f.read()
+    speech_json = Path(speech_path).read_bytes().decode('utf-8')
     print(f"✓ 演讲稿加载成功: {len(speech_json)} 字符")
 
     return slides_text, speech_json
@@ -436,24 +438,23 @@ def load_files(slides_path: str, speech_path: str) -> tuple:
 def save_results(result: Dict, report: str, output_dir: str = '.'):
     """保存评估结果"""
 
-    import os
-
     # 保存JSON
-    json_path = os.path.join(output_dir, 'evaluation_result.json')
-    with open(json_path, 'w', encoding='utf-8') as f:
-        json.dump(result, f, ensure_ascii=False, indent=2)
+    json_path = Path(output_dir) / 'evaluation_result.json'
+    if HAS_ORJSON:
+        json_path.write_bytes(orjson.dumps(result, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+    else:
+        json_path.write_bytes(json.dumps(result, ensure_ascii=False, indent=2).encode('utf-8'))
     print(f"JSON结果已保存: {json_path}")
 
     # 保存报告
-    report_path = os.path.join(output_dir, 'evaluation_report.txt')
-    with open(report_path, 'w', encoding='utf-8') as f:
-        f.write(report)
+    report_path = Path(output_dir) / 'evaluation_report.txt'
+    report_path.write_bytes(report.encode('utf-8'))
     print(f"文本报告已保存: {report_path}")
 
 
 # ============ 主评估函数 ============
 
-def run_qwen_evaluation(api_key: str, slides_path: str, speech_path: str):
+def run_qwen_evaluation(api_key: str, slides_path: str, speech_path: str, use_cache: bool = True):
     """
     运行Qwen API评估
 
@@ -461,6 +462,7 @@ def run_qwen_evaluation(api_key: str, slides_path: str, speech_path: str):
         api_key: 阿里云DashScope API密钥
         slides_path: 幻灯片路径 (.pdf 或 .txt)
         speech_path: 演讲稿路径
+        use_cache: 是否复用缓存的评估回复（False时总是重新调用API）
     """
 
     print("\n" + "╔" + "=" * 78 + "╗")
@@ -481,7 +483,7 @@ def run_qwen_evaluation(api_key: str, slides_path: str, speech_path: str):
     # 创建评估器
     print("【步骤2】创建评估器")
     print("=" * 80)
-    evaluator = QwenSpeechEvaluator(api_key)
+    evaluator = QwenSpeechEvaluator(api_key) if use_cache else QwenSpeechEvaluator(api_key, cache_path=None)
     print("✓ 评估器创建成功")
     print()
 
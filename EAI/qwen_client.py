@@ -0,0 +1,174 @@
+"""
+Qwen VL Plus API 客户端
+
+演讲稿生成（speech.py）和评估（llm_evaluator.py）共用此模块。通过get_client获取的实例
+按API密钥在进程内复用，两边共享同一个HTTP连接池和同一个限流窗口。
+"""
+
+import asyncio
+import collections
+import functools
+import time
+from typing import Callable, Optional
+
+import httpx
+import openai
+
+try:
+    # httpx的HTTP/2支持依赖h2：pip install "httpx[http2]"
+    import h2  # noqa: F401
+    HAS_HTTP2 = True
+except ImportError:
+    HAS_HTTP2 = False
+
+BASE_URL = "https://dashscope.aliyuncs.com/compatible-mode/v1"
+# 长连接池：并发请求复用已建立的TCP+TLS连接（HTTP/2下还可在同一连接上多路复用）
+HTTP_LIMITS = httpx.Limits(max_connections=64, max_keepalive_connections=32)
+
+
+class QwenVLPlus:
+    """Qwen VL Plus API 封装"""
+
+    def __init__(self, api_key, max_concurrent: int = 8, rpm: int = 60,
+                 max_retries: int = 3, max_tokens: int = 4096):
+        """
+        Args:
+            api_key: 阿里云DashScope API密钥
+            max_concurrent: 异步调用的最大并发请求数
+            rpm: 异步调用每分钟最多发出的请求数（主动限流，避免触发服务端限速）
+            max_retries: 限速/超时/连接错误时SDK自动重试的次数（指数退避）
+            max_tokens: 单次回复的最大token数，防止输出失控
+        """
+        self.model = "qwen-vl-plus"
+        self.max_tokens = max_tokens
+        # 连接阶段10秒超时，避免网络异常时长时间挂起
+        timeout = openai.Timeout(60, connect=10)
+        self.llm = openai.OpenAI(
+            api_key=api_key,
+            base_url=BASE_URL,
+            timeout=timeout,
+            max_retries=max_retries,
+            http_client=openai.DefaultHttpxClient(http2=HAS_HTTP2, limits=HTTP_LIMITS)
+        )
+        # 异步客户端的连接池绑定事件循环，在_ensure_limiter中按当前循环创建
+        self._client_options = dict(
+            api_key=api_key,
+            base_url=BASE_URL,
+            timeout=timeout,
+            max_retries=max_retries
+        )
+        self.allm = None
+        self.max_concurrent = max_concurrent
+        self.rpm = rpm
+        # 信号量同样绑定事件循环；限流窗口则在所有调用间共享
+        self._loop = None
+        self._sem = None
+        self._call_times = collections.deque()
+
+    def _cons_kwargs(self, messages: list[dict], enable_thinking=False, return_json=False) -> dict:
+        response_format = {"type": "json_object"} if not enable_thinking and return_json else {"type": "text"}
+        kwargs = {
+            "model": self.model,
+            "messages": messages,
+            "temperature": 0.3,
+            "max_tokens": self.max_tokens,
+            "extra_body": {"enable_thinking": enable_thinking},
+            "response_format": response_format,
+        }
+        return kwargs
+
+    def completion(self, messages: list[dict], enable_thinking=False, return_json=False,
+                   stream: bool = False, on_delta: Optional[Callable[[str], None]] = None) -> dict:
+        """
+        Args:
+            stream: 是否流式接收回复（边生成边返回，长回复可以尽早看到进度）
+            on_delta: 流式模式下每收到一段文本时的回调
+        Returns:
+            完整的回复文本（流式模式下为各段拼接的结果）
+        """
+        # 限速和超时由SDK按max_retries自动退避重试
+        kwargs = self._cons_kwargs(messages, enable_thinking, return_json)
+        if not stream:
+            rsp = self.llm.chat.completions.create(**kwargs)
+            return rsp.choices[0].message.content
+
+        parts = []
+        for event in self.llm.chat.completions.create(stream=True, **kwargs):
+            # 最后一个事件可能只携带usage，choices为空
+            piece = event.choices[0].delta.content if event.choices else None
+            if piece:
+                parts.append(piece)
+                if on_delta is not None:
+                    on_delta(piece)
+        return "".join(parts)
+
+    def _ensure_limiter(self):
+        """为当前事件循环准备并发信号量和异步客户端（每次asyncio.run都会创建新的循环）
+
+        异步客户端只在创建它的循环中使用，调用方应在该循环结束前调用aclose()释放连接
+        """
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._sem = asyncio.Semaphore(self.max_concurrent)
+            self.allm = openai.AsyncOpenAI(
+                http_client=openai.DefaultAsyncHttpxClient(http2=HAS_HTTP2, limits=HTTP_LIMITS),
+                **self._client_options
+            )
+
+    async def aclose(self):
+        """关闭当前事件循环的异步客户端及其连接池，下次异步调用时重新创建"""
+        if self.allm is not None:
+            await self.allm.close()
+        self.allm = None
+        self._loop = None
+        self._sem = None
+
+    async def _wait_rate_slot(self):
+        """滑动窗口限流：保证任意60秒内发出的请求不超过rpm个"""
+        while True:
+            now = time.monotonic()
+            while self._call_times and now - self._call_times[0] >= 60:
+                self._call_times.popleft()
+            if len(self._call_times) < self.rpm:
+                self._call_times.append(now)
+                return
+            await asyncio.sleep(60 - (now - self._call_times[0]))
+
+    async def acompletion(self, messages: list[dict], enable_thinking=False, return_json=False,
+                          stream: bool = False, on_delta: Optional[Callable[[str], None]] = None) -> dict:
+        """completion的异步版本，可配合asyncio.gather并发发送多个请求"""
+        self._ensure_limiter()
+        kwargs = self._cons_kwargs(messages, enable_thinking, return_json)
+        async with self._sem:
+            await self._wait_rate_slot()
+            if not stream:
+                rsp = await self.allm.chat.completions.create(**kwargs)
+                return rsp.choices[0].message.content
+
+            parts = []
+            async for event in await self.allm.chat.completions.create(stream=True, **kwargs):
+                piece = event.choices[0].delta.content if event.choices else None
+                if piece:
+                    parts.append(piece)
+                    if on_delta is not None:
+                        on_delta(piece)
+        return "".join(parts)
+
+
+def stream_progress(label: str = "已接收") -> Callable[[str], None]:
+    """返回一个on_delta回调，在同一行刷新已接收的字符数"""
+    received = 0
+
+    def on_delta(piece: str):
+        nonlocal received
+        received += len(piece)
+        print(f"  {label} {received} 字符...", end="\r")
+
+    return on_delta
+
+
+@functools.lru_cache(maxsize=4)
+def get_client(api_key: str) -> QwenVLPlus:
+    """按API密钥返回进程内共享的QwenVLPlus实例"""
+    return QwenVLPlus(api_key)
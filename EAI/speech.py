@@ -1,6 +1,12 @@
-import openai
-import time
+import asyncio
+import contextlib
+import hashlib
+import itertools
+import json
+import os
+import tempfile
 import base64
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import List, Union
 from io import BytesIO
@@ -9,88 +15,214 @@ from io import BytesIO
 from pdf2image import convert_from_path
 from PIL import Image
 
+try:
+    # C实现（SIMD加速）的base64，比标准库快数倍
+    import pybase64
+    HAS_PYBASE64 = True
+except ImportError:
+    HAS_PYBASE64 = False
 
-class QwenVLPlus:
-    def __init__(self, api_key):
-        self.model = "qwen-vl-plus"
-        self.llm = openai.OpenAI(api_key=api_key, base_url="https://dashscope.aliyuncs.com/compatible-mode/v1")
-
-    def _cons_kwargs(self, messages: list[dict]) -> dict:
-        kwargs = {
-            "model": self.model,
-            "messages": messages,
-            "temperature": 0.3,
-            "timeout": 60,
-        }
-        return kwargs
-
-    def completion(self, messages: list[dict], enable_thinking=False, return_json=False) -> dict:
-        response_format = {"type": "json_object"} if not enable_thinking and return_json else {"type": "text"}
-        extra_body = {"enable_thinking": enable_thinking}
-        try:
-            rsp = self.llm.chat.completions.create(**self._cons_kwargs(messages), extra_body=extra_body, response_format=response_format)
-        except openai.RateLimitError as e: 
-            print("OpenAI API request exceeded rate limit")
-            time.sleep(60)
-            rsp = self.llm.chat.completions.create(**self._cons_kwargs(messages), extra_body=extra_body, response_format=response_format)
-        except openai.APITimeoutError as e:
-            print("OpenAI API request timed out")
-            time.sleep(60)
-            rsp = self.llm.chat.completions.create(**self._cons_kwargs(messages), extra_body=extra_body, response_format=response_format)
-
-        return rsp.choices[0].message.content
+from _speech_cache import SpeechCache
+from qwen_client import get_client, stream_progress
 
 
 class SlideToSpeechGenerator:
     """将PDF或PPTX幻灯片文件转换为演讲稿的生成器"""
-    def __init__(self, api_key: str):
+    # 视觉模型常见的单图长边上限，更大的图片会被服务端缩小，提前缩放可减小请求体积
+    MAX_IMAGE_EDGE = 1568
+
+    # 提示模板只在类定义时构建一次，每次调用只填入编号和首尾页的额外要求
+    SLIDE_PROMPT_TEMPLATE = """请基于这张幻灯片（第{n}/{total}张）生成一段演讲稿。
+要求：
+1. 语言自然流畅，适合口头表达
+2. 突出幻灯片的核心信息和关键要点
+3. {opening}
+4. {closing}
+5. 适当添加过渡语句，使演讲连贯
+6. 控制在200-400字左右
+7. 用生动的语言解释幻灯片上的数据、图表等内容
+
+请直接输出演讲稿内容，不要添加额外的说明。"""
+    SLIDE_OPENING = '这是开场幻灯片，需要有吸引人的开场白'
+    SLIDE_CLOSING = '这是最后一张幻灯片，需要有总结和结束语'
+    POLISH_PROMPT_PREFIX = "以下是基于多张幻灯片生成的演讲稿初稿，请帮我优化：\n\n"
+    POLISH_PROMPT_SUFFIX = """
+
+优化要求：
+1. 保持每部分的核心内容不变
+2. 优化幻灯片之间的过渡，使演讲更连贯自然
+3. 统一语言风格和表达方式
+4. 确保开场和结尾更有感染力
+5. 保留【幻灯片 X】的标记
+6. 让整体演讲更有逻辑性和说服力
+
+请直接输出优化后的完整演讲稿。"""
+
+    def __init__(self, api_key: str, cache_path: str = ".speech_cache.json", img_format: str = "JPEG",
+                 slides_cache_dir: str = os.path.join(".cache", "slides")):
         """
         初始化生成器
         
         Args:
             api_key: Qwen API密钥
+            cache_path: 图片→演讲稿缓存文件路径，传None关闭缓存
+            img_format: 上传图片的编码格式，默认JPEG（体积远小于PNG）；
+                幻灯片以大面积纯色/细线为主、介意压缩痕迹时可改为"PNG"
+            slides_cache_dir: PDF渲染结果的缓存目录，同一PDF（路径、修改时间、dpi均相同）
+                不再重复渲染；传None时每次渲染到临时目录
         """
-        self.qwen = QwenVLPlus(api_key)
-    
-    def _image_to_base64(self, image: Image.Image) -> str:
+        self.qwen = get_client(api_key)
+        self.cache = SpeechCache(cache_path) if cache_path else None
+        self.img_format = img_format.upper()
+        self._data_url_prefix = f"data:image/{self.img_format.lower()};base64,"
+        self.slides_cache_dir = slides_cache_dir
+
+    @staticmethod
+    def _b64_string(data: bytes) -> str:
+        """base64编码并返回str"""
+        if HAS_PYBASE64:
+            return pybase64.b64encode_as_string(data)
+        return base64.b64encode(data).decode('ascii')
+
+    def _image_url(self, image_bytes: bytes) -> str:
+        """把编码好的图片字节包装成data URL（前缀在初始化时已生成）"""
+        return self._data_url_prefix + self._b64_string(image_bytes)
+
+    def _image_to_bytes(self, image: Image.Image) -> bytes:
+        """
+        将PIL Image对象按img_format编码为字节（同时用作缓存键的图片内容）
+        Args:
+            image: PIL Image对象
+        Returns:
+            编码后的图片字节
+        """
+        if max(image.size) > self.MAX_IMAGE_EDGE:
+            image = image.copy()
+            image.thumbnail((self.MAX_IMAGE_EDGE, self.MAX_IMAGE_EDGE), Image.LANCZOS)
+        buffered = BytesIO()
+        if self.img_format == "JPEG":
+            if image.mode not in ("RGB", "L"):
+                image = image.convert("RGB")
+            image.save(buffered, format="JPEG", quality=85, optimize=True)
+        else:
+            image.save(buffered, format=self.img_format)
+        return buffered.getvalue()
+
+    def _encode_images(self, images: List[Image.Image]) -> List[bytes]:
+        """
+        用线程池并行编码多张图片（PIL的JPEG/PNG编码会释放GIL）
+        Args:
+            images: PIL Image对象列表
+        Returns:
+            与images顺序一致的编码字节列表
+        """
+        if len(images) <= 1:
+            return [self._image_to_bytes(image) for image in images]
+        with ThreadPoolExecutor(max_workers=min(8, len(images))) as ex:
+            return list(ex.map(self._image_to_bytes, images))
+
+    def _image_to_base64(self, image: Image.Image, image_bytes: bytes = None) -> str:
         """
         将PIL Image对象转换为base64字符串
         Args:
             image: PIL Image对象
+            image_bytes: 已编码好的图片字节（可选，避免重复编码）
         Returns:
             base64编码的图片字符串
         """
-        buffered = BytesIO()
-        image.save(buffered, format="PNG")
-        return base64.b64encode(buffered.getvalue()).decode('utf-8')
+        if image_bytes is None:
+            image_bytes = self._image_to_bytes(image)
+        return self._b64_string(image_bytes)
+
+    def _cache_lookup(self, image_list: List[bytes], prompt: str):
+        """
+        查询缓存
+        Returns:
+            (缓存键, 缓存结果)，未启用缓存时键为None，未命中时结果为None
+        """
+        if self.cache is None:
+            return None, None
+        # 模型名参与哈希，换模型后不会命中旧结果
+        key = SpeechCache.make_key([self.qwen.model.encode('utf-8'), *image_list], prompt)
+        return key, self.cache.get(key)
     
-    def _extract_slides_from_pdf(self, pdf_path: str, dpi: int = 150) -> List[Image.Image]:
+    def _extract_slides_from_pdf(self, pdf_path: str, dpi: int = 110, output_folder: str = None) -> List[Image.Image]:
         """
         从PDF文件提取所有幻灯片为图片
         Args:
             pdf_path: PDF文件路径
-            dpi: 图片分辨率，默认150
+            dpi: 图片分辨率，默认110（视觉模型会自行缩放，更高的分辨率只会增大请求体积）
+            output_folder: 渲染结果的存放目录（可选）。指定时页面以JPEG写入该目录，
+                返回按需加载的图片，不会把所有页的像素同时留在内存里；
+                调用方负责在目录删除前关闭这些图片
         Returns:
             PIL Image对象列表
         """
         print(f"正在从PDF提取幻灯片...")
-        images = convert_from_path(pdf_path, dpi=dpi,poppler_path=r'C:\Users\czrch\poppler\poppler-23.11.0\Library\bin')
+        # 多个poppler进程分段并行渲染
+        options = dict(
+            dpi=dpi,
+            thread_count=os.cpu_count() or 1,
+            poppler_path=r'C:\Users\czrch\poppler\poppler-23.11.0\Library\bin'
+        )
+        if output_folder is None:
+            images = convert_from_path(pdf_path, **options)
+        else:
+            paths = convert_from_path(pdf_path, output_folder=output_folder, paths_only=True,
+                                      fmt="jpeg", jpegopt={"quality": 85}, **options)
+            # 按页码重命名，目录中的文件名排序即页序
+            slide_paths = []
+            for i, path in enumerate(paths, 1):
+                slide_path = os.path.join(output_folder, f"{i:04d}.jpg")
+                os.replace(path, slide_path)
+                slide_paths.append(slide_path)
+            # Image.open只读取文件头，像素数据在编码这一页时才加载
+            images = [Image.open(path) for path in slide_paths]
         print(f"成功提取 {len(images)} 张幻灯片")
         return images
 
+    def _load_or_render_slides(self, pdf_path: str, dpi: int) -> List[Image.Image]:
+        """
+        从slides_cache_dir读取已渲染的幻灯片，没有缓存时渲染并写入缓存
+        Args:
+            pdf_path: PDF文件路径
+            dpi: 图片分辨率
+        Returns:
+            PIL Image对象列表（按需加载，调用方负责关闭）
+        """
+        key = f"{os.path.abspath(pdf_path)}:{os.stat(pdf_path).st_mtime_ns}:{dpi}"
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).hexdigest()
+        slide_dir = os.path.join(self.slides_cache_dir, digest)
+        # 渲染全部完成后才写标记文件，中断留下的半成品不会被当作缓存
+        done_marker = os.path.join(slide_dir, ".done")
+
+        if os.path.exists(done_marker):
+            names = sorted(name for name in os.listdir(slide_dir) if name.endswith(".jpg"))
+            print(f"使用已渲染的幻灯片缓存: {slide_dir} ({len(names)} 张)")
+            return [Image.open(os.path.join(slide_dir, name)) for name in names]
+
+        os.makedirs(slide_dir, exist_ok=True)
+        for name in os.listdir(slide_dir):
+            os.remove(os.path.join(slide_dir, name))
+        images = self._extract_slides_from_pdf(pdf_path, dpi, slide_dir)
+        open(done_marker, 'w').close()
+        return images
+
     
-    def _create_image_message(self, image: Image.Image, prompt: str) -> List[dict]:
+    def _create_image_message(self, image: Image.Image, prompt: str, image_bytes: bytes = None) -> List[dict]:
         """
         创建包含图片的消息
         
         Args:
             image: PIL Image对象
             prompt: 文本提示
+            image_bytes: 已编码好的图片字节（可选）
             
         Returns:
             格式化的消息列表
         """
-        base64_image = self._image_to_base64(image)
+        if image_bytes is None:
+            image_bytes = self._image_to_bytes(image)
         
         messages = [
             {
@@ -98,7 +230,7 @@ class SlideToSpeechGenerator:
                 "content": [
                     {
                         "type": "image_url",
-                        "image_url": {"url": f"data:image/png;base64,{base64_image}"}
+                        "image_url": {"url": self._image_url(image_bytes)}
                     },
                     {"type": "text", "text": prompt}
                 ]
@@ -106,6 +238,22 @@ class SlideToSpeechGenerator:
         ]
         return messages
     
+    def _build_slide_prompt(self, slide_number: int, total_slides: int) -> str:
+        """
+        构建单张幻灯片的演讲稿生成提示
+        Args:
+            slide_number: 当前幻灯片编号
+            total_slides: 总幻灯片数
+        Returns:
+            文本提示
+        """
+        return self.SLIDE_PROMPT_TEMPLATE.format(
+            n=slide_number,
+            total=total_slides,
+            opening=self.SLIDE_OPENING if slide_number == 1 else '',
+            closing=self.SLIDE_CLOSING if slide_number == total_slides else ''
+        )
+
     def _generate_speech_for_image_slide(
         self, 
         image: Image.Image, 
@@ -121,24 +269,158 @@ class SlideToSpeechGenerator:
         Returns:
             生成的演讲稿
         """
-        is_first = (slide_number == 1)
-        is_last = (slide_number == total_slides)
-        
-        prompt = f"""请基于这张幻灯片（第{slide_number}/{total_slides}张）生成一段演讲稿。
+        prompt = self._build_slide_prompt(slide_number, total_slides)
+        image_bytes = self._image_to_bytes(image)
+        key, speech = self._cache_lookup([image_bytes], prompt)
+        if speech is not None:
+            return speech
+        messages = self._create_image_message(image, prompt, image_bytes)
+        speech = self.qwen.completion(messages)
+        if key is not None:
+            self.cache.set(key, speech)
+        return speech
+
+    async def _agenerate_speech_for_image_slide(
+        self,
+        image: Image.Image,
+        slide_number: int,
+        total_slides: int
+    ) -> str:
+        """
+        _generate_speech_for_image_slide的异步版本
+        Args:
+            image: 幻灯片图片
+            slide_number: 当前幻灯片编号
+            total_slides: 总幻灯片数
+        Returns:
+            生成的演讲稿
+        """
+        prompt = self._build_slide_prompt(slide_number, total_slides)
+        image_bytes = await asyncio.to_thread(self._image_to_bytes, image)
+        key, speech = self._cache_lookup([image_bytes], prompt)
+        if speech is not None:
+            return speech
+        messages = self._create_image_message(image, prompt, image_bytes)
+        speech = await self.qwen.acompletion(messages)
+        if key is not None:
+            self.cache.set(key, speech)
+        return speech
+
+    def _build_chunk_prompt(self, start_idx: int, count: int, total_slides: int) -> str:
+        """
+        构建多张幻灯片合并请求的提示，要求按页返回JSON
+        Args:
+            start_idx: 本组第一张幻灯片的编号
+            count: 本组幻灯片数量
+            total_slides: 总幻灯片数
+        Returns:
+            文本提示
+        """
+        end_idx = start_idx + count - 1
+        notes = []
+        if start_idx == 1:
+            notes.append('第1张是开场幻灯片，需要有吸引人的开场白')
+        if end_idx == total_slides:
+            notes.append(f'第{total_slides}张是最后一张幻灯片，需要有总结和结束语')
+        extra = f"\n8. {'；'.join(notes)}" if notes else ''
+
+        prompt = f"""以下{count}张图片依次是演示文稿的第{start_idx}-{end_idx}张幻灯片（共{total_slides}张），请为每张幻灯片分别生成一段演讲稿。
 要求：
 1. 语言自然流畅，适合口头表达
 2. 突出幻灯片的核心信息和关键要点
-3. {'这是开场幻灯片，需要有吸引人的开场白' if is_first else ''}
-4. {'这是最后一张幻灯片，需要有总结和结束语' if is_last else ''}
-5. 适当添加过渡语句，使演讲连贯
-6. 控制在200-400字左右
-7. 用生动的语言解释幻灯片上的数据、图表等内容
+3. 每段演讲稿只讲对应那一张幻灯片的内容
+4. 适当添加过渡语句，使演讲连贯
+5. 每段控制在200-400字左右
+6. 用生动的语言解释幻灯片上的数据、图表等内容
+7. 以JSON格式输出，index为幻灯片编号：{{"slides": [{{"index": {start_idx}, "text": "..."}}]}}{extra}
+
+请只输出JSON，不要添加额外的说明。"""
+        return prompt
+
+    async def _agenerate_speech_chunk(
+        self,
+        images_slice: List[Image.Image],
+        start_idx: int,
+        total_slides: int
+    ) -> List[str]:
+        """
+        把多张幻灯片放进同一个请求生成演讲稿，减少请求次数（DashScope按请求数限流）
+        Args:
+            images_slice: 本组幻灯片图片
+            start_idx: 本组第一张幻灯片的编号
+            total_slides: 总幻灯片数
+        Returns:
+            本组每张幻灯片的演讲稿，顺序与images_slice一致
+        """
+        if len(images_slice) == 1:
+            return [await self._agenerate_speech_for_image_slide(images_slice[0], start_idx, total_slides)]
 
-请直接输出演讲稿内容，不要添加额外的说明。"""
-        
-        messages = self._create_image_message(image, prompt)
-        speech = self.qwen.completion(messages)
-        return speech
+        prompt = self._build_chunk_prompt(start_idx, len(images_slice), total_slides)
+        # 编码放到线程里做，不阻塞事件循环中其他组的请求
+        image_list = await asyncio.to_thread(self._encode_images, images_slice)
+        key, cached = self._cache_lookup(image_list, prompt)
+        if cached is not None:
+            return json.loads(cached)
+
+        content = [
+            {
+                "type": "image_url",
+                "image_url": {"url": self._image_url(image_bytes)}
+            }
+            for image_bytes in image_list
+        ]
+        content.append({"type": "text", "text": prompt})
+        messages = [{"role": "user", "content": content}]
+
+        texts = {}
+        try:
+            result = json.loads(await self.qwen.acompletion(messages, return_json=True))
+            for item in result.get("slides", []):
+                texts[int(item["index"])] = item["text"]
+        except (ValueError, TypeError, KeyError, AttributeError):
+            print(f"第{start_idx}张起的合并请求结果无法解析，改为逐页生成")
+
+        # 模型漏掉的页单独补发请求
+        missing = [i for i in range(start_idx, start_idx + len(images_slice)) if not texts.get(i)]
+        if missing:
+            filled = await asyncio.gather(*(
+                self._agenerate_speech_for_image_slide(images_slice[i - start_idx], i, total_slides)
+                for i in missing
+            ))
+            texts.update(zip(missing, filled))
+
+        speeches = [texts[i] for i in range(start_idx, start_idx + len(images_slice))]
+        if key is not None:
+            self.cache.set(key, json.dumps(speeches, ensure_ascii=False))
+        return speeches
+
+    async def _agenerate_speeches_per_slide(
+        self,
+        images: List[Image.Image],
+        slides_per_request: int = 4
+    ) -> List[str]:
+        """
+        并发为每张幻灯片生成演讲稿（请求耗时主要是网络等待，并发可大幅缩短总时间）
+        Args:
+            images: 所有幻灯片图片列表
+            slides_per_request: 每个请求合并的幻灯片数，1表示逐页单独请求
+        Returns:
+            与images顺序一致的演讲稿列表
+        """
+        total_slides = len(images)
+        slides_per_request = max(1, slides_per_request)
+        it = iter(images)
+        tasks = []
+        start_idx = 1
+        while chunk := list(itertools.islice(it, slides_per_request)):
+            tasks.append(asyncio.create_task(self._agenerate_speech_chunk(chunk, start_idx, total_slides)))
+            start_idx += len(chunk)
+        try:
+            chunks = await asyncio.gather(*tasks)
+        finally:
+            # 异步客户端的连接池绑定本次asyncio.run的循环，循环结束前关闭
+            await self.qwen.aclose()
+        return [speech for chunk in chunks for speech in chunk]
 
     
     # def generate_speech_from_file(
@@ -211,23 +493,18 @@ class SlideToSpeechGenerator:
         messages = [
             {
                 "role": "user",
-                "content": f"""以下是基于多张幻灯片生成的演讲稿初稿，请帮我优化：
-
-                {draft_speech}
-
-                优化要求：
-                1. 保持每部分的核心内容不变
-                2. 优化幻灯片之间的过渡，使演讲更连贯自然
-                3. 统一语言风格和表达方式
-                4. 确保开场和结尾更有感染力
-                5. 保留【幻灯片 X】的标记
-                6. 让整体演讲更有逻辑性和说服力
-
-                请直接输出优化后的完整演讲稿。"""
+                "content": "".join((self.POLISH_PROMPT_PREFIX, draft_speech, self.POLISH_PROMPT_SUFFIX))
             }
         ]
-        
-        polished = self.qwen.completion(messages)
+
+        # 初稿不变时直接复用上次的优化结果
+        key, polished = self._cache_lookup([], messages[0]["content"])
+        if polished is not None:
+            return polished
+        polished = self.qwen.completion(messages, stream=True, on_delta=stream_progress())
+        print()
+        if key is not None:
+            self.cache.set(key, polished)
         return polished
 
     def _generate_speech_batch(self, images: List[Image.Image]) -> str:
@@ -260,26 +537,66 @@ b.每一页slide对应的演讲稿文本内容的分点列表:script:slide,text"
                 }
             ]
 
-            # 添加所有幻灯片图片
-            for i, image in enumerate(images, 1):
-                base64_image = self._image_to_base64(image)
-                content.append({
-                    "type": "image_url",
-                    "image_url": {"url": f"data:image/png;base64,{base64_image}"}
-                })
+            # 添加所有幻灯片图片（并行编码）
+            content.extend(
+                {"type": "image_url", "image_url": {"url": self._image_url(image_bytes)}}
+                for image_bytes in self._encode_images(images)
+            )
 
             messages = [{"role": "user", "content": content}]
 
-            # 生成演讲稿
-            speech = self.qwen.completion(messages)
+            # 生成演讲稿（流式接收，显示生成进度）
+            speech = self.qwen.completion(messages, stream=True, on_delta=stream_progress())
+            print()
             return speech
 
+    def _generate_speech_from_images(
+            self,
+            images: List[Image.Image],
+            batch_mode: bool = True,
+            slides_per_request: int = 4
+    ) -> str:
+        """
+            根据幻灯片图片生成完整演讲稿
+
+            Args:
+                images: 所有幻灯片图片列表
+                batch_mode: 是否批量处理（一次性处理所有幻灯片）
+                slides_per_request: 逐页模式下每个请求合并的幻灯片数
+
+            Returns:
+                完整的演讲稿
+        """
+        # 生成演讲稿
+        print(f"\n开始生成演讲稿...")
+        if batch_mode:
+            # 批量模式：一次性处理所有幻灯片（推荐）
+            print("使用批量模式：一次性处理所有幻灯片...")
+            full_speech = self._generate_speech_batch(images)
+        else:
+            # 逐页模式：分别处理每张幻灯片（并发请求）
+            print("使用逐页模式：分别处理每张幻灯片...")
+            print(f"正在并发处理 {len(images)} 张幻灯片（每个请求 {slides_per_request} 张）...")
+            slide_speeches = asyncio.run(self._agenerate_speeches_per_slide(images, slides_per_request))
+            speeches = [f"【幻灯片 {i}】\n{speech}" for i, speech in enumerate(slide_speeches, 1)]
+            # 合并所有演讲稿
+            full_speech = "\n\n".join(speeches)
+
+                # 优化整体连贯性
+            print("\n正在优化演讲稿的整体连贯性...")
+            full_speech = self._polish_speech(full_speech)
+            if self.cache is not None:
+                print(self.cache.stats())
+
+        return full_speech
+
     def generate_speech_from_file(
             self,
             file_path: str,
             output_path: str = None,
-            dpi: int = 150,
-            batch_mode: bool = True
+            dpi: int = 110,
+            batch_mode: bool = True,
+            slides_per_request: int = 4
     ) -> str:
         """
             从PDF或PPTX文件生成完整演讲稿
@@ -287,8 +604,9 @@ b.每一页slide对应的演讲稿文本内容的分点列表:script:slide,text"
             Args:
                 file_path: PDF或PPTX文件路径
                 output_path: 输出文件路径（可选）
-                dpi: PDF转图片的分辨率，默认150
+                dpi: PDF转图片的分辨率，默认110
                 batch_mode: 是否批量处理（推荐True，一次性处理所有幻灯片）
+                slides_per_request: 逐页模式下每个请求合并的幻灯片数，默认4
 
             Returns:
                 完整的演讲稿
@@ -298,37 +616,24 @@ b.每一页slide对应的演讲稿文本内容的分点列表:script:slide,text"
         if not file_path.exists():
             raise FileNotFoundError(f"文件不存在: {file_path}")
 
-            # 根据文件类型提取幻灯片
-        if file_path.suffix.lower() == '.pdf':
-            images = self._extract_slides_from_pdf(str(file_path), dpi)
-        else:
+        if file_path.suffix.lower() != '.pdf':
             raise ValueError(f"不支持的文件格式: {file_path.suffix}")
 
-        # 生成演讲稿
-        print(f"\n开始生成演讲稿...")
-        if batch_mode:
-            # 批量模式：一次性处理所有幻灯片（推荐）
-            print("使用批量模式：一次性处理所有幻灯片...")
-            full_speech = self._generate_speech_batch(images)
-        else:
-            # 逐页模式：分别处理每张幻灯片
-            print("使用逐页模式：分别处理每张幻灯片...")
-            speeches = []
-            total_slides = len(images)
-
-            for i, image in enumerate(images, 1):
-                print(f"正在处理第 {i}/{total_slides} 张幻灯片...")
-                speech = self._generate_speech_for_image_slide(image, i, total_slides)
-                speeches.append(f"【幻灯片 {i}】\n{speech}")
-                # 添加短暂延迟，避免API限流
-                if i < total_slides:
-                    time.sleep(1)
-                # 合并所有演讲稿
-            full_speech = "\n\n".join(speeches)
-
-                # 优化整体连贯性
-            print("\n正在优化演讲稿的整体连贯性...")
-            full_speech = self._polish_speech(full_speech)
+        with contextlib.ExitStack() as stack:
+            if self.slides_cache_dir:
+                images = self._load_or_render_slides(str(file_path), dpi)
+            else:
+                # 未启用渲染缓存时渲染到临时目录，生成结束后随目录一起清理
+                tmpdir = stack.enter_context(tempfile.TemporaryDirectory())
+                images = self._extract_slides_from_pdf(str(file_path), dpi, tmpdir)
+            # 回调按后进先出执行，图片文件会先于临时目录删除被关闭
+            stack.callback(lambda: [image.close() for image in images])
+            try:
+                full_speech = self._generate_speech_from_images(images, batch_mode, slides_per_request)
+            finally:
+                # 本次生成的缓存条目统一写盘一次（中途失败时也保留已完成的结果）
+                if self.cache is not None:
+                    self.cache.flush()
 
             # 保存到文件
         if output_path:
@@ -354,7 +659,7 @@ def main():
         speech = generator.generate_speech_from_file(
             file_path="presentation.pdf",
             output_path="speech_qwen_vl.txt",
-            dpi=150,  # 调整图片质量
+            dpi=110,  # 调整图片质量
             batch_mode = True
         )
         print("\n生成的演讲稿预览：")
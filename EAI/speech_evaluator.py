@@ -3,12 +3,275 @@
 Presentation Speech Quality Evaluation System with PDF Support
 """
 
+import bisect
+import functools
+import itertools
 import json
+import operator
+import os
 import re
-from typing import Dict, List, Tuple
+import sys
+from typing import Dict, Iterator, List, Tuple
 from collections import Counter
 import math
 
+try:
+    # Aho–Corasick自动机：一遍扫描即可找出所有关键词，耗时与关键词数量无关
+    import ahocorasick
+    HAS_AHOCORASICK = True
+except ImportError:
+    HAS_AHOCORASICK = False
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+# 评估中用到的正则表达式，模块加载时编译一次
+# 这些模式都没有可产生歧义的嵌套量词，标准re引擎下耗时与文本长度呈线性，不存在回溯爆炸；
+# 未改用re2：re2的\b、\w、\d只认ASCII（紧挨中文的英文词匹配结果会变），
+# 且其Python绑定在含中文的文本上需要额外的编码转换，实测比re慢
+_RE_EN_WORD = re.compile(r'\b[a-z]{4,}\b')                        # 英文单词（4个字母以上）
+_RE_CJK_2_4 = re.compile(r'[\u4e00-\u9fff]{2,4}')                  # 中文词组（2-4字）
+_RE_CJK_3_8 = re.compile(r'[\u4e00-\u9fff]{3,8}')                  # 中文术语（3-8字）
+_RE_CJK_RUN = re.compile(r'[\u4e00-\u9fff]+')                      # 连续中文
+_RE_TITLE_PHRASE = re.compile(r'\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\b')  # 大写字母开头的短语
+_RE_HYPHENATED = re.compile(r'\b[a-z]+-[a-z]+(?:-[a-z]+)*\b')        # 连字符词组
+_RE_ABBR = re.compile(r'\b[A-Z]{2,}\b')                            # 缩写词
+_RE_WORD = re.compile(r'\b\w+\b')
+_RE_EN_TOKEN = re.compile(r'\b[a-z]+\b')
+_RE_YEAR_PCT_FLOAT = re.compile(r'\b\d{4}\b|\b\d+%\b|\b\d+\.\d+\b')  # 年份、百分比、小数
+_RE_FULL_NAME = re.compile(r'\b[A-Z][a-z]+\s+[A-Z][a-z]+\b')         # 人名
+_RE_DURATION_NUM = re.compile(r'(\d+\.?\d*)')
+_RE_SENTENCE_SPLIT = re.compile(r'[.!?。!?]+')
+_RE_JSON_FENCE = re.compile(r'^```(?:json)?|```$')                  # 首尾的markdown代码块标记
+
+# ASCII中的非单词字符（\w以外）统一替换为空格，之后用split切词
+_ASCII_NONWORD_TO_SPACE = str.maketrans(
+    {c: ' ' for c in map(chr, range(128)) if not (c.isalnum() or c == '_')}
+)
+
+
+def _english_words(text: str) -> List[str]:
+    """
+    等价于_RE_EN_WORD.findall(text)（text需已转小写）
+    纯ASCII文本用translate+split在C层完成切分；混有中文等非ASCII字符时
+    逐段回退反而更慢，直接使用正则
+    """
+    if not text.isascii():
+        return _RE_EN_WORD.findall(text)
+    return [w for w in text.translate(_ASCII_NONWORD_TO_SPACE).split()
+            if len(w) >= 4 and w.isalpha()]
+
+
+def _loads_json(content: str):
+    """优先用orjson解析；orjson不接受的输入（如NaN）回退到标准库，结果与json.loads一致"""
+    if HAS_ORJSON:
+        try:
+            return orjson.loads(content)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(content)
+
+
+# 纯ASCII文本里的句末标点统一换成\x01，之后一次split切句
+_ASCII_SENTENCE_END_TO_SEP = str.maketrans(dict.fromkeys('.!?', '\x01'))
+
+
+def _split_sentences(text: str) -> List[str]:
+    """
+    按句末标点切分文本，与_RE_SENTENCE_SPLIT.split(text)的区别仅在于连续标点之间
+    会多出空片段（调用方按非空白过滤）
+    纯ASCII文本用translate+split完成；含中文时translate需逐字符查表，反而比正则慢
+    """
+    if not text.isascii():
+        return _RE_SENTENCE_SPLIT.split(text)
+    return text.translate(_ASCII_SENTENCE_END_TO_SEP).split('\x01')
+
+
+class _KeywordMatcher:
+    """多关键词匹配：安装了pyahocorasick时一遍扫描文本，否则逐个关键词查找"""
+
+    def __init__(self, keywords: List[str]):
+        self.keywords = tuple(keywords)
+        if HAS_AHOCORASICK:
+            self._automaton = ahocorasick.Automaton()
+            for kw in self.keywords:
+                self._automaton.add_word(kw, kw)
+            self._automaton.make_automaton()
+
+    def any_in(self, text: str) -> bool:
+        """文本中是否出现任一关键词"""
+        if HAS_AHOCORASICK:
+            for _ in self._automaton.iter(text):
+                return True
+            return False
+        return any(kw in text for kw in self.keywords)
+
+    def found(self, text: str) -> set:
+        """文本中出现过的关键词集合"""
+        if HAS_AHOCORASICK:
+            return {kw for _, kw in self._automaton.iter(text)}
+        return {kw for kw in self.keywords if kw in text}
+
+    def distinct(self, text: str) -> int:
+        """文本中出现过的不同关键词个数"""
+        return len(self.found(text))
+
+
+class _MarkerCounter:
+    """把多组标记词放进同一个自动机，一遍扫描同时得到每组的出现次数之和"""
+
+    def __init__(self, groups: Dict[str, List[str]]):
+        self.groups = {name: tuple(words) for name, words in groups.items()}
+        if HAS_AHOCORASICK:
+            self._automaton = ahocorasick.Automaton()
+            for name, words in self.groups.items():
+                for word in words:
+                    # 同一个词属于多个组时每组都计数
+                    names = self._automaton.get(word, ())
+                    self._automaton.add_word(word, names + (name,))
+            self._automaton.make_automaton()
+
+    def counts(self, text: str) -> Counter:
+        """返回 {组名: 该组各标记词出现次数之和}（标记词自身不会重叠时与逐个str.count求和一致）"""
+        if HAS_AHOCORASICK:
+            result = Counter({name: 0 for name in self.groups})
+            for _, names in self._automaton.iter(text):
+                for name in names:
+                    result[name] += 1
+            return result
+        return Counter({name: sum(text.count(word) for word in words)
+                        for name, words in self.groups.items()})
+
+
+# 各项评估用到的标记词，匹配器在模块加载时构建一次
+_TRANSITIONS = _KeywordMatcher([
+    "let's", 'next', 'now', 'moving', 'turn to', 'consider',
+    'however', 'therefore', 'furthermore', 'additionally',
+    'in conclusion', 'to summarize', 'brings us to',
+    '接下来', '现在', '然后', '因此', '此外', '总之',
+    '让我们', '下面', '首先', '其次', '最后'
+])
+_CONVERSATIONAL = _KeywordMatcher([
+    "let's", "we'll", "i'm", "you'll", "we're", "i'll",
+    'today', 'now', 'here', 'our', 'my', 'your',
+    'everyone', 'thank you', 'hello', 'hi',
+    '大家', '我们', '今天', '现在', '让我们',
+    '你们', '咱们', '这里', '那么'
+])
+_TECH_TERMS = _KeywordMatcher([
+    'llm', 'large language model', 'fact-checking', 'hallucination',
+    'argumentation', 'evidence', 'verification', 'benchmark',
+    'algorithm', 'dataset', 'evaluation', 'accuracy'
+])
+# 例子和解释标记词都要统计出现次数，合并到同一次扫描中
+_DETAIL_MARKERS = _MarkerCounter({
+    'example': [
+        'example', 'for instance', 'such as', 'like',
+        'consider', "let's take", 'case', 'illustrate',
+        '例如', '比如', '举例', '案例', '考虑'
+    ],
+    'explanation': [
+        'this means', 'in other words', 'specifically',
+        'that is', 'namely', 'essentially', 'simply put',
+        '也就是说', '换句话说', '具体来说', '简单来说'
+    ],
+})
+_CONTEXT = _KeywordMatcher([
+    'background', 'motivation', 'why', 'important', 'challenge',
+    'problem', 'goal', 'objective', 'significance',
+    '背景', '动机', '为什么', '重要', '挑战', '问题', '目标', '意义'
+])
+
+
+# 等级分数线（升序）及对应等级：分数不低于第i条分数线时取_GRADES[i+1]
+_GRADE_THRESHOLDS = (0.60, 0.65, 0.70, 0.75, 0.80, 0.85, 0.90)
+_GRADES = ('F (不及格)', 'D (及格)', 'C (中等)', 'C+ (中等)',
+           'B (良好)', 'B+ (良好)', 'A (优秀)', 'A+ (优秀)')
+
+# 改进建议规则（按优先级排列），按评估维度分组：(评估维度, ((指标, 比较运算, 阈值, 建议), ...))
+# 比较成立时给出建议；分组后每个维度的结果字典只需取一次
+_SUGGESTION_RULES = (
+    # 内容一致性问题（最高优先级）
+    ('content_consistency', (
+        ('keyword_coverage', operator.lt, 0.6,
+         " [高优先级] 关键词覆盖不足 - 确保幻灯片中的重要概念都在演讲稿中体现"),
+        ('slide_title_coverage', operator.lt, 0.7,
+         " [高优先级] 幻灯片标题覆盖不完整 - 每张幻灯片的主题都应在演讲中明确提及"),
+        ('hallucination_risk_score', operator.gt, 0.4,
+         " [高优先级] 幻觉风险较高 - 减少幻灯片中未出现的额外内容，保持一致性"),
+        ('fact_accuracy', operator.lt, 0.7,
+         " [高优先级] 事实准确性不足 - 确保幻灯片中的数字、人名等关键事实被准确传达"),
+    )),
+    # 结构问题（高优先级）
+    ('structure', (
+        ('coherence_score', operator.lt, 0.7,
+         " [中优先级] 逻辑连贯性有待提升 - 确保演讲内容按照幻灯片顺序展开"),
+        ('transition_score', operator.lt, 0.5,
+         " [中优先级] 缺少过渡语句 - 在段落间添加'接下来'、'让我们看看'等过渡词"),
+        ('time_balance_score', operator.lt, 0.6,
+         " [中优先级] 时间分配不均衡 - 调整各部分时长，避免某些部分过长或过短"),
+    )),
+    # 语言质量问题（中优先级）
+    ('language_quality', (
+        ('conversational_score', operator.lt, 0.5,
+         " [中低优先级] 口语化程度不足 - 使用更多'我们'、'让我们'等口语化表达"),
+        ('clarity_score', operator.lt, 0.6,
+         " [中低优先级] 句子长度需优化 - 调整句子长度，建议12-25词为宜"),
+        ('professionalism_score', operator.lt, 0.6,
+         " [中低优先级] 专业性不足 - 适当使用幻灯片中的专业术语和概念"),
+    )),
+    # 细节问题（较低优先级）
+    ('detail_richness', (
+        ('example_usage_score', operator.lt, 0.4,
+         " [低优先级] 缺少具体例子 - 为抽象概念添加具体案例说明"),
+        ('explanation_quality', operator.lt, 0.4,
+         " [低优先级] 解释不够充分 - 为技术术语和复杂概念提供更多解释"),
+        ('expansion_ratio_score', operator.lt, 0.5,
+         " [低优先级] 内容扩展不足 - 适当增加细节描述，丰富演讲内容"),
+    )),
+)
+
+# 优点规则，分组方式同上：(评估维度, ((指标, 比较运算, 阈值, 优点), ...))
+_STRENGTH_RULES = (
+    ('content_consistency', (
+        ('keyword_coverage', operator.ge, 0.75, "✓ 关键词覆盖全面，准确传达了幻灯片核心内容"),
+        ('fact_accuracy', operator.ge, 0.8, "✓ 事实数据准确，保持了良好的信息一致性"),
+        ('hallucination_risk_score', operator.le, 0.25, "✓ 内容忠实于原材料，幻觉风险控制良好"),
+    )),
+    ('structure', (
+        ('coherence_score', operator.ge, 0.8, "✓ 逻辑结构清晰，演讲流程合理"),
+        ('transition_score', operator.ge, 0.65, "✓ 段落过渡自然，听众体验流畅"),
+        ('organization_score', operator.ge, 0.8, "✓ 整体组织结构完整，有明确的引入和总结"),
+    )),
+    ('language_quality', (
+        ('conversational_score', operator.ge, 0.6, "✓ 口语化表达自然，适合现场演讲"),
+        ('clarity_score', operator.ge, 0.75, "✓ 表达清晰易懂，句子长度适中"),
+        ('professionalism_score', operator.ge, 0.7, "✓ 专业性强，恰当使用了学术术语"),
+    )),
+    ('detail_richness', (
+        ('example_usage_score', operator.ge, 0.5, "✓ 合理使用例子，帮助听众理解"),
+        ('explanation_quality', operator.ge, 0.5, "✓ 解释充分，技术概念阐述清楚"),
+        ('context_provision', operator.ge, 0.65, "✓ 提供了充足的背景信息"),
+    )),
+    ('time_management', (
+        ('duration_appropriateness', operator.ge, 0.75, "✓ 时长规划合理，符合演讲场合要求"),
+        ('time_distribution_score', operator.ge, 0.7, "✓ 时间分配得当，重点突出"),
+    )),
+)
+
+# 没有触发任何规则时的默认文本，以及按总分给出的通用建议
+_NO_ISSUES_MESSAGE = " 整体质量优秀，各项指标均达标，继续保持！"
+_NO_STRENGTHS_MESSAGE = "继续努力，提升各项指标"
+_OVERALL_ADVICE_LOW = "\n 总体建议: 重点关注内容一致性和结构合理性，这是演讲稿的基础"
+_OVERALL_ADVICE_MID = "\n 总体建议: 在保持现有质量的基础上，可进一步优化语言表达和细节丰富度"
+
+# 建议/优点列表中单条的格式（预先绑定的str.format，逐条调用时无需再解析格式串）
+_SUGGESTION_ITEM_FMT = "  {}. {}".format
+_STRENGTH_ITEM_FMT = "  • {}".format
+
 
 class SpeechEvaluator:
     """演讲稿评估器 - 支持PDF提取的文本"""
@@ -24,32 +287,94 @@ class SpeechEvaluator:
         self.slides_content = slides_text
 
         # 解析JSON,处理可能的markdown代码块
-        speech_json_str = speech_json_str.strip()
-        if speech_json_str.startswith('```json'):
-            speech_json_str = speech_json_str[7:]
-        if speech_json_str.startswith('```'):
-            speech_json_str = speech_json_str[3:]
-        if speech_json_str.endswith('```'):
-            speech_json_str = speech_json_str[:-3]
-        speech_json_str = speech_json_str.strip()
-
-        self.speech_data = json.loads(speech_json_str)
+        speech_json_str = _RE_JSON_FENCE.sub('', speech_json_str.strip()).strip()
+
+        self.speech_data = _loads_json(speech_json_str)
         self.plan = self.speech_data.get('plan', [])
         self.script = self.speech_data.get('script', [])
 
+        # evaluate_all的结果，首次调用时计算
+        self._results = None
+
+    # script按字段拆成的并列列表、演讲稿全文及其派生结果被多项评估共用，首次访问时计算一次
+
+    @functools.cached_property
+    def _script_texts(self) -> List[str]:
+        return [s['text'] for s in self.script]
+
+    @functools.cached_property
+    def _script_slides(self) -> list:
+        return [s['slide'] for s in self.script]
+
+    @functools.cached_property
+    def _script_first_lower(self) -> List[str]:
+        """每段的第一句（小写）"""
+        return [text.split('.', 1)[0].lower() for text in self._script_texts]
+
+    @functools.cached_property
+    def _speech_text(self) -> str:
+        return ' '.join(self._script_texts)
+
+    @functools.cached_property
+    def _speech_text_lower(self) -> str:
+        return self._speech_text.lower()
+
+    @functools.cached_property
+    def _speech_words(self) -> List[str]:
+        return self._speech_text_lower.split()
+
+    @functools.cached_property
+    def _slides_words(self) -> List[str]:
+        return self.slides_content.split()
+
+    @functools.cached_property
+    def _speech_en_tokens(self) -> List[str]:
+        """演讲稿中的全部英文词（小写），关键词提取和词汇丰富度共用"""
+        return _RE_EN_TOKEN.findall(self._speech_text_lower)
+
+    @functools.cached_property
+    def _speech_cjk_runs(self) -> List[str]:
+        return _RE_CJK_RUN.findall(self._speech_text_lower)
+
+    @functools.cached_property
+    def _slides_keywords(self) -> Counter:
+        return self._extract_keywords(self.slides_content)
+
+    @functools.cached_property
+    def _speech_keywords(self) -> Counter:
+        return self._extract_keywords(self._speech_text, self._speech_en_tokens)
+
+    @functools.cached_property
+    def _slides_concepts(self) -> set:
+        return self._extract_key_concepts(self.slides_content)
+
+    @functools.cached_property
+    def _speech_concepts(self) -> set:
+        return self._extract_key_concepts(self._speech_text)
+
+    @functools.cached_property
+    def _durations_min(self) -> List[float]:
+        """plan中每页的时长（分钟），各项时间评估共用，只解析一次"""
+        return [self._parse_duration(p.get('duration', '0 minute')) for p in self.plan]
+
+    @functools.cached_property
+    def _positive_durations(self) -> List[float]:
+        return [d for d in self._durations_min if d > 0]
+
+    @functools.cached_property
+    def _detail_marker_counts(self) -> Counter:
+        return _DETAIL_MARKERS.counts(self._speech_text_lower)
+
     # ============ 1. 内容一致性评估 ============
 
     def evaluate_content_consistency(self) -> Dict:
         """评估内容一致性"""
 
-        # 提取幻灯片关键词和关键概念
-        slides_keywords = self._extract_keywords(self.slides_content)
-        slides_concepts = self._extract_key_concepts(self.slides_content)
-
-        # 提取演讲稿关键词和概念
-        speech_text = ' '.join([s['text'] for s in self.script])
-        speech_keywords = self._extract_keywords(speech_text)
-        speech_concepts = self._extract_key_concepts(speech_text)
+        # 幻灯片与演讲稿的关键词和关键概念（各只提取一次）
+        slides_keywords = self._slides_keywords
+        slides_concepts = self._slides_concepts
+        speech_keywords = self._speech_keywords
+        speech_concepts = self._speech_concepts
 
         # 计算覆盖率
         keyword_coverage = self._calculate_coverage(slides_keywords, speech_keywords)
@@ -77,15 +402,23 @@ class SpeechEvaluator:
                             (1 - hallucination_risk)) / 5
         }
 
-    def _extract_keywords(self, text: str) -> Counter:
-        """提取关键词"""
+    def _extract_keywords(self, text: str, english_tokens: List[str] = None) -> Counter:
+        """
+        提取关键词
+        Args:
+            text: 原文
+            english_tokens: 已从小写原文中提取好的全部英文词（_RE_EN_TOKEN），传入时直接复用
+        """
         # 转小写
         text = text.lower()
         # 提取英文单词和中文词组
-        # 英文单词
-        english_words = re.findall(r'\b[a-z]{4,}\b', text)
+        # 英文单词（4个字母以上的英文词恰好是全部英文词中长度>=4的那些）
+        if english_tokens is None:
+            english_words = _english_words(text)
+        else:
+            english_words = [w for w in english_tokens if len(w) >= 4]
         # 中文词组(2-4字)
-        chinese_words = re.findall(r'[\u4e00-\u9fff]{2,4}', text)
+        chinese_words = _RE_CJK_2_4.findall(text)
 
         # 合并
         all_words = english_words + chinese_words
@@ -106,14 +439,14 @@ class SpeechEvaluator:
         """提取关键概念(多词短语)"""
         # 提取专业术语和重要概念
         # 英文: 大写字母开头的短语、连字符词组
-        english_concepts = re.findall(r'\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\b', text)
-        english_concepts += re.findall(r'\b[a-z]+-[a-z]+(?:-[a-z]+)*\b', text)
+        english_concepts = _RE_TITLE_PHRASE.findall(text)
+        english_concepts += _RE_HYPHENATED.findall(text)
 
         # 中文: 常见的专业术语模式
-        chinese_concepts = re.findall(r'[\u4e00-\u9fff]{3,8}', text)
+        chinese_concepts = _RE_CJK_3_8.findall(text)
 
         # 提取缩写词
-        abbreviations = re.findall(r'\b[A-Z]{2,}\b', text)
+        abbreviations = _RE_ABBR.findall(text)
 
         all_concepts = set(english_concepts + chinese_concepts + abbreviations)
 
@@ -127,8 +460,9 @@ class SpeechEvaluator:
             return 1.0
 
         if isinstance(source_items, Counter):
-            source_keys = set(source_items.keys())
-            target_keys = set(target_items.keys()) if isinstance(target_items, Counter) else set(target_items)
+            # dict_keys直接支持集合运算，无需先复制成set
+            source_keys = source_items.keys()
+            target_keys = target_items.keys() if isinstance(target_items, Counter) else target_items
             covered = len(source_keys & target_keys)
             return covered / len(source_keys)
         else:
@@ -143,15 +477,17 @@ class SpeechEvaluator:
         if not plan_titles:
             return 1.0
 
-        # 在演讲稿中查找标题关键词
-        speech_text = ' '.join([s['text'] for s in self.script]).lower()
+        # 提取各标题中的关键词
+        title_word_lists = [_RE_WORD.findall(title.lower()) for title in plan_titles]
+
+        # 所有标题的长词合并后在演讲稿中只扫描一遍
+        long_words = {word for words in title_word_lists for word in words if len(word) > 3}
+        seen = _KeywordMatcher(sorted(long_words)).found(self._speech_text_lower) if long_words else set()
 
         covered = 0
-        for title in plan_titles:
-            # 提取标题中的关键词
-            title_words = re.findall(r'\b\w+\b', title.lower())
+        for title_words in title_word_lists:
             # 至少一半的关键词出现在演讲稿中
-            matches = sum(1 for word in title_words if word in speech_text and len(word) > 3)
+            matches = sum(1 for word in title_words if word in seen)
             if matches >= len(title_words) / 2:
                 covered += 1
 
@@ -160,21 +496,23 @@ class SpeechEvaluator:
     def _check_fact_consistency(self) -> float:
         """检查事实一致性"""
         # 提取数字、年份、人名等关键事实
-        slides_numbers = re.findall(r'\b\d{4}\b|\b\d+%\b|\b\d+\.\d+\b', self.slides_content)
-        slides_names = re.findall(r'\b[A-Z][a-z]+\s+[A-Z][a-z]+\b', self.slides_content)
-
-        speech_text = ' '.join([s['text'] for s in self.script])
-        speech_numbers = re.findall(r'\b\d{4}\b|\b\d+%\b|\b\d+\.\d+\b', speech_text)
-        speech_names = re.findall(r'\b[A-Z][a-z]+\s+[A-Z][a-z]+\b', speech_text)
+        slides_numbers = _RE_YEAR_PCT_FLOAT.findall(self.slides_content)
+        slides_names = _RE_FULL_NAME.findall(self.slides_content)
 
         # 检查幻灯片中的事实是否在演讲稿中被提及
         total_facts = len(slides_numbers) + len(slides_names)
         if total_facts == 0:
             return 1.0
 
-        matched_facts = 0
-        matched_facts += sum(1 for num in slides_numbers if num in speech_text)
-        matched_facts += sum(1 for name in slides_names if name in speech_text)
+        # 演讲稿中的数字和人名各抽取一次建成集合，每个事实O(1)判定。
+        # 事实须在演讲稿中作为完整的数字/人名被抽取到才算提及，
+        # 例如幻灯片中的'3.14'不再匹配演讲稿中的'3.1415'
+        speech_text = self._speech_text
+        speech_numbers = set(_RE_YEAR_PCT_FLOAT.findall(speech_text))
+        speech_names = set(_RE_FULL_NAME.findall(speech_text))
+
+        matched_facts = (sum(1 for num in slides_numbers if num in speech_numbers) +
+                         sum(1 for name in slides_names if name in speech_names))
 
         return matched_facts / total_facts
 
@@ -185,7 +523,7 @@ class SpeechEvaluator:
             return 0.0
 
         # 演讲稿中出现但幻灯片中没有的关键词
-        new_keywords = set(target_keywords.keys()) - set(source_keywords.keys())
+        new_keywords = target_keywords.keys() - source_keywords.keys()
 
         # 计算新词占比
         risk_ratio = len(new_keywords) / len(target_keywords)
@@ -219,13 +557,11 @@ class SpeechEvaluator:
     def _evaluate_coherence(self) -> float:
         """评估逻辑连贯性"""
         slide_numbers = [p['slide'] for p in self.plan]
-        script_slides = [s['slide'] for s in self.script]
+        script_slides = self._script_slides
 
         # 检查是否顺序合理
-        is_sequential = all(slide_numbers[i] <= slide_numbers[i+1]
-                           for i in range(len(slide_numbers)-1))
-        script_sequential = all(script_slides[i] <= script_slides[i+1]
-                               for i in range(len(script_slides)-1))
+        is_sequential = all(a <= b for a, b in zip(slide_numbers, slide_numbers[1:]))
+        script_sequential = all(a <= b for a, b in zip(script_slides, script_slides[1:]))
 
         # 检查是否每张幻灯片都有对应的演讲内容
         plan_slides = set(slide_numbers)
@@ -245,7 +581,7 @@ class SpeechEvaluator:
         duration_str = duration_str.lower().strip()
 
         # 提取数字
-        number_match = re.search(r'(\d+\.?\d*)', duration_str)
+        number_match = _RE_DURATION_NUM.search(duration_str)
         if not number_match:
             return 0.0
 
@@ -264,14 +600,9 @@ class SpeechEvaluator:
 
     def _evaluate_time_balance(self) -> float:
         """评估时间分配平衡性"""
-        durations = []
-        for p in self.plan:
-            duration_str = p.get('duration', '0 minute')
-            duration_minutes = self._parse_duration(duration_str)
-            if duration_minutes > 0:
-                durations.append(duration_minutes)
-
-        if not durations or len(durations) < 3:
+        durations = self._positive_durations
+
+        if len(durations) < 3:
             return 1.0
 
         # 计算变异系数(标准差/均值)
@@ -289,39 +620,24 @@ class SpeechEvaluator:
 
     def _evaluate_transitions(self) -> float:
         """评估过渡自然性"""
-        transition_phrases = [
-            "let's", 'next', 'now', 'moving', 'turn to', 'consider',
-            'however', 'therefore', 'furthermore', 'additionally',
-            'in conclusion', 'to summarize', 'brings us to',
-            '接下来', '现在', '然后', '因此', '此外', '总之',
-            '让我们', '下面', '首先', '其次', '最后'
-        ]
-
-        transition_count = 0
-        for i, script in enumerate(self.script):
-            if i == 0:  # 跳过第一张
-                continue
-            text = script['text'].lower()
-            # 检查段落开头是否有过渡词
-            first_sentence = text.split('.')[0] if '.' in text else text
-            if any(phrase in first_sentence.lower() for phrase in transition_phrases):
-                transition_count += 1
+        # 检查段落开头是否有过渡词（跳过第一段）
+        transition_count = sum(1 for first_sentence in self._script_first_lower[1:]
+                               if _TRANSITIONS.any_in(first_sentence))
 
         ideal_transitions = len(self.script) - 1
         return transition_count / ideal_transitions if ideal_transitions > 0 else 1.0
 
     def _evaluate_organization(self) -> float:
         """评估整体组织结构"""
-        # 检查是否有引言、主体、结论
-        has_intro = any('introduction' in p.get('title', '').lower() or
-                       'intro' in p.get('title', '').lower() or
-                       i == 0 for i, p in enumerate(self.plan))
+        # 检查是否有引言、主体、结论（标题只转一次小写）
+        titles = [p.get('title', '').lower() for p in self.plan]
+        last = len(titles) - 1
 
-        has_conclusion = any('conclusion' in p.get('title', '').lower() or
-                            'summary' in p.get('title', '').lower() or
-                            'q&a' in p.get('title', '').lower() or
-                            i == len(self.plan) - 1
-                            for i, p in enumerate(self.plan))
+        # 'introduction'包含'intro'，只需检查后者；首页本身即视为引言
+        has_intro = any(i == 0 or 'intro' in t for i, t in enumerate(titles))
+
+        has_conclusion = any(i == last or 'conclusion' in t or 'summary' in t or 'q&a' in t
+                     for i, t in enumerate(titles))
 
         has_body = len(self.plan) >= 3
 
@@ -348,15 +664,15 @@ class SpeechEvaluator:
 
     def _evaluate_clarity(self) -> float:
         """评估清晰度"""
-        all_text = ' '.join([s['text'] for s in self.script])
-        sentences = re.split(r'[.!?。!?]+', all_text)
-        sentences = [s.strip() for s in sentences if s.strip()]
+        # 每句的词数；只含空白的片段词数为0，不计入句子数
+        sentence_lengths = list(map(len, map(str.split, _split_sentences(self._speech_text))))
+        sentence_count = len(sentence_lengths) - sentence_lengths.count(0)
 
-        if not sentences:
+        if not sentence_count:
             return 0.0
 
         # 计算平均句子长度
-        avg_length = sum(len(s.split()) for s in sentences) / len(sentences)
+        avg_length = sum(sentence_lengths) / sentence_count
 
         # 理想句子长度:12-25词
         if 12 <= avg_length <= 25:
@@ -368,19 +684,10 @@ class SpeechEvaluator:
 
     def _evaluate_conversational_style(self) -> float:
         """评估口语化程度"""
-        conversational_markers = [
-            "let's", "we'll", "i'm", "you'll", "we're", "i'll",
-            'today', 'now', 'here', 'our', 'my', 'your',
-            'everyone', 'thank you', 'hello', 'hi',
-            '大家', '我们', '今天', '现在', '让我们',
-            '你们', '咱们', '这里', '那么'
-        ]
-
-        all_text = ' '.join([s['text'] for s in self.script]).lower()
-        words = all_text.split()
+        words = self._speech_words
 
-        marker_count = sum(1 for word in words
-                          if any(marker in word for marker in conversational_markers))
+        # 重复出现的词只判断一次，再按出现次数累加
+        marker_count = sum(n for word, n in Counter(words).items() if _CONVERSATIONAL.any_in(word))
 
         # 每100词有2-6个口语标记比较理想
         ratio = marker_count / len(words) * 100 if words else 0
@@ -394,11 +701,8 @@ class SpeechEvaluator:
 
     def _evaluate_vocabulary(self) -> float:
         """评估词汇丰富度"""
-        all_text = ' '.join([s['text'] for s in self.script]).lower()
-        # 提取所有词
-        words = re.findall(r'\b[a-z]+\b', all_text)
-        chinese_words = re.findall(r'[\u4e00-\u9fff]+', all_text)
-        all_words = words + chinese_words
+        # 所有词
+        all_words = self._speech_en_tokens + self._speech_cjk_runs
 
         if not all_words:
             return 0.0
@@ -419,19 +723,11 @@ class SpeechEvaluator:
     def _evaluate_professionalism(self) -> float:
         """评估专业性"""
         # 检查是否使用了幻灯片中的专业术语
-        all_text = ' '.join([s['text'] for s in self.script])
-
         # 从幻灯片提取的专业术语
-        technical_terms = [
-            'llm', 'large language model', 'fact-checking', 'hallucination',
-            'argumentation', 'evidence', 'verification', 'benchmark',
-            'algorithm', 'dataset', 'evaluation', 'accuracy'
-        ]
-
-        term_usage = sum(1 for term in technical_terms if term in all_text.lower())
+        term_usage = _TECH_TERMS.distinct(self._speech_text_lower)
 
         # 至少使用一半的专业术语
-        return min(term_usage / (len(technical_terms) / 2), 1.0)
+        return min(term_usage / (len(_TECH_TERMS.keywords) / 2), 1.0)
 
     # ============ 4. 细节丰富度评估 ============
 
@@ -454,8 +750,8 @@ class SpeechEvaluator:
 
     def _calculate_expansion_ratio(self) -> float:
         """计算内容扩展比"""
-        slides_words = len(self.slides_content.split())
-        speech_words = len(' '.join([s['text'] for s in self.script]).split())
+        slides_words = len(self._slides_words)
+        speech_words = len(self._speech_words)
 
         if slides_words == 0:
             return 0.0
@@ -472,16 +768,7 @@ class SpeechEvaluator:
 
     def _check_example_usage(self) -> float:
         """检查例子使用"""
-        example_indicators = [
-            'example', 'for instance', 'such as', 'like',
-            'consider', "let's take", 'case', 'illustrate',
-            '例如', '比如', '举例', '案例', '考虑'
-        ]
-
-        all_text = ' '.join([s['text'] for s in self.script]).lower()
-
-        example_count = sum(all_text.count(indicator)
-                           for indicator in example_indicators)
+        example_count = self._detail_marker_counts['example']
 
         # 每4-5张幻灯片至少1个例子
         ideal_examples = len(self.script) / 4.5
@@ -491,16 +778,7 @@ class SpeechEvaluator:
 
     def _evaluate_explanations(self) -> float:
         """评估解释质量"""
-        explanation_markers = [
-            'this means', 'in other words', 'specifically',
-            'that is', 'namely', 'essentially', 'simply put',
-            '也就是说', '换句话说', '具体来说', '简单来说'
-        ]
-
-        all_text = ' '.join([s['text'] for s in self.script]).lower()
-
-        explanation_count = sum(all_text.count(marker)
-                               for marker in explanation_markers)
+        explanation_count = self._detail_marker_counts['explanation']
 
         # 每3张幻灯片至少1个解释
         ideal_explanations = len(self.script) / 3
@@ -511,15 +789,7 @@ class SpeechEvaluator:
     def _evaluate_context(self) -> float:
         """评估背景信息提供"""
         # 检查是否提供了背景、动机、意义等信息
-        context_keywords = [
-            'background', 'motivation', 'why', 'important', 'challenge',
-            'problem', 'goal', 'objective', 'significance',
-            '背景', '动机', '为什么', '重要', '挑战', '问题', '目标', '意义'
-        ]
-
-        all_text = ' '.join([s['text'] for s in self.script]).lower()
-
-        context_count = sum(1 for keyword in context_keywords if keyword in all_text)
+        context_count = _CONTEXT.distinct(self._speech_text_lower)
 
         # 至少提及3-5个背景相关概念
         return min(context_count / 4, 1.0)
@@ -545,11 +815,7 @@ class SpeechEvaluator:
 
     def _calculate_total_time(self) -> float:
         """计算总时长(分钟)"""
-        total = 0.0
-        for p in self.plan:
-            duration_str = p.get('duration', '0 minute')
-            total += self._parse_duration(duration_str)
-        return total
+        return sum(self._durations_min, 0.0)
 
     def _evaluate_duration_appropriateness(self, total_minutes: float) -> float:
         """评估总时长合理性"""
@@ -568,12 +834,7 @@ class SpeechEvaluator:
 
     def _evaluate_time_distribution(self) -> float:
         """评估时间分布"""
-        durations = []
-        for p in self.plan:
-            duration_str = p.get('duration', '0 minute')
-            duration_minutes = self._parse_duration(duration_str)
-            if duration_minutes > 0:
-                durations.append(duration_minutes)
+        durations = self._positive_durations
 
         if len(durations) < 3:
             return 1.0
@@ -583,21 +844,15 @@ class SpeechEvaluator:
         outro_ok = durations[-1] <= 2
 
         # 检查中间部分是否充实
-        middle_durations = durations[1:-1] if len(durations) > 2 else durations
-        middle_ok = all(d >= 1 for d in middle_durations)
+        middle_ok = all(d >= 1 for d in durations[1:-1])
 
         return (float(intro_ok) + float(outro_ok) + float(middle_ok)) / 3
 
     def _evaluate_pace(self) -> float:
         """评估节奏一致性"""
-        durations = []
-        for p in self.plan:
-            duration_str = p.get('duration', '0 minute')
-            duration_minutes = self._parse_duration(duration_str)
-            if duration_minutes > 0:
-                durations.append(duration_minutes)
-
-        if not durations:
+        durations = self._positive_durations
+
+        if len(durations) == 0:
             return 1.0
 
         # 检查是否有极端值(过长或过短)
@@ -610,7 +865,12 @@ class SpeechEvaluator:
     # ============ 综合评估 ============
 
     def evaluate_all(self) -> Dict:
-        """执行所有评估"""
+        """执行所有评估（结果会被缓存，generate_report等重复调用时直接返回）"""
+        if self._results is None:
+            self._results = self._compute_all()
+        return self._results
+
+    def _compute_all(self) -> Dict:
         print("=" * 70)
         print("正在评估演讲稿质量...")
         print("=" * 70)
@@ -645,228 +905,137 @@ class SpeechEvaluator:
 
     def _get_grade(self, score: float) -> str:
         """根据分数获取等级"""
-        if score >= 0.90:
-            return 'A+ (优秀)'
-        elif score >= 0.85:
-            return 'A (优秀)'
-        elif score >= 0.80:
-            return 'B+ (良好)'
-        elif score >= 0.75:
-            return 'B (良好)'
-        elif score >= 0.70:
-            return 'C+ (中等)'
-        elif score >= 0.65:
-            return 'C (中等)'
-        elif score >= 0.60:
-            return 'D (及格)'
-        else:
-            return 'F (不及格)'
+        return _GRADES[bisect.bisect_right(_GRADE_THRESHOLDS, score)]
+
+    @staticmethod
+    def _fmt_row(label: str, score: float, threshold: float) -> str:
+        """报告中的一行评分：标签、得分及是否达到阈值"""
+        return f"  {label}{score:.1%}  {'✓ 优秀' if score >= threshold else '✗ 需改进'}\n"
 
     def generate_report(self) -> str:
         """生成详细评估报告"""
+        return ''.join(self.iter_report())
+
+    def iter_report(self) -> Iterator[str]:
+        """逐段生成评估报告，写文件时可边生成边写入，无需先拼出整份报告"""
         results = self.evaluate_all()
+        row = self._fmt_row
 
-        report = "\n" + "=" * 70 + "\n"
-        report += " " * 20 + "演讲稿质量评估报告\n"
-        report += " " * 20 + "Speech Quality Evaluation Report\n"
-        report += "=" * 70 + "\n\n"
+        yield "\n" + "=" * 70 + "\n"
+        yield " " * 20 + "演讲稿质量评估报告\n"
+        yield " " * 20 + "Speech Quality Evaluation Report\n"
+        yield "=" * 70 + "\n\n"
 
         # 总体评分
-        report += f"【总体评分】 {results['overall_score']:.1%}\n"
-        report += f"【评级等级】 {results['grade']}\n"
-        total_time = self._calculate_total_time()
-        report += f"【演讲时长】 {total_time:.1f}分钟 ({int(total_time * 60)}秒)\n"
-        report += f"【幻灯片数】 {len(self.plan)}张\n\n"
+        yield f"【总体评分】 {results['overall_score']:.1%}\n"
+        yield f"【评级等级】 {results['grade']}\n"
+        total_time = results['time_management']['total_minutes']
+        yield f"【演讲时长】 {total_time:.1f}分钟 ({int(total_time * 60)}秒)\n"
+        yield f"【幻灯片数】 {len(self.plan)}张\n\n"
 
         # 各维度评分可视化
-        report += "-" * 70 + "\n"
-        report += "各维度得分总览:\n"
-        report += "-" * 70 + "\n"
+        yield "-" * 70 + "\n"
+        yield "各维度得分总览:\n"
+        yield "-" * 70 + "\n"
+        name_map = {
+            'content_consistency': '内容一致性',
+            'structure': '结构合理性',
+            'language_quality': '语言质量',
+            'detail_richness': '细节丰富度',
+            'time_management': '时间规划'
+        }
         for key, weight in results['weights'].items():
             score = results[key]['overall_score']
             bar_length = int(score * 40)
             bar = "█" * bar_length + "░" * (40 - bar_length)
-            name_map = {
-                'content_consistency': '内容一致性',
-                'structure': '结构合理性',
-                'language_quality': '语言质量',
-                'detail_richness': '细节丰富度',
-                'time_management': '时间规划'
-            }
-            report += f"{name_map[key]:8s} ({weight:.0%}) [{bar}] {score:.1%}\n"
-
-        report += "\n" + "=" * 70 + "\n"
-        report += "详细评分分析:\n"
-        report += "=" * 70 + "\n\n"
+            yield f"{name_map[key]:8s} ({weight:.0%}) [{bar}] {score:.1%}\n"
+
+        yield "\n" + "=" * 70 + "\n"
+        yield "详细评分分析:\n"
+        yield "=" * 70 + "\n\n"
 
         # 1. 内容一致性
-        report += "【1. 内容一致性】 权重: 30%\n"
-        report += "-" * 70 + "\n"
+        yield "【1. 内容一致性】 权重: 30%\n"
+        yield "-" * 70 + "\n"
         cc = results['content_consistency']
-        report += f"  关键词覆盖率:     {cc['keyword_coverage']:.1%}  "
-        report += f"{'✓ 优秀' if cc['keyword_coverage'] >= 0.7 else '✗ 需改进'}\n"
-        report += f"  概念覆盖率:       {cc['concept_coverage']:.1%}  "
-        report += f"{'✓ 优秀' if cc['concept_coverage'] >= 0.7 else '✗ 需改进'}\n"
-        report += f"  标题覆盖率:       {cc['slide_title_coverage']:.1%}  "
-        report += f"{'✓ 优秀' if cc['slide_title_coverage'] >= 0.8 else '✗ 需改进'}\n"
-        report += f"  事实准确性:       {cc['fact_accuracy']:.1%}  "
-        report += f"{'✓ 优秀' if cc['fact_accuracy'] >= 0.8 else '✗ 需改进'}\n"
-        report += f"  幻觉风险评分:     {cc['hallucination_risk_score']:.1%}  "
-        report += f"{'✓ 风险低' if cc['hallucination_risk_score'] <= 0.3 else '⚠ 风险较高'}\n"
-        report += f"  综合得分:         {cc['overall_score']:.1%}\n\n"
+        yield row("关键词覆盖率:     ", cc['keyword_coverage'], 0.7)
+        yield row("概念覆盖率:       ", cc['concept_coverage'], 0.7)
+        yield row("标题覆盖率:       ", cc['slide_title_coverage'], 0.8)
+        yield row("事实准确性:       ", cc['fact_accuracy'], 0.8)
+        yield f"  幻觉风险评分:     {cc['hallucination_risk_score']:.1%}  "
+        yield f"{'✓ 风险低' if cc['hallucination_risk_score'] <= 0.3 else '⚠ 风险较高'}\n"
+        yield f"  综合得分:         {cc['overall_score']:.1%}\n\n"
 
         # 2. 结构合理性
-        report += "【2. 结构合理性】 权重: 25%\n"
-        report += "-" * 70 + "\n"
+        yield "【2. 结构合理性】 权重: 25%\n"
+        yield "-" * 70 + "\n"
         st = results['structure']
-        report += f"  逻辑连贯性:       {st['coherence_score']:.1%}  "
-        report += f"{'✓ 优秀' if st['coherence_score'] >= 0.8 else '✗ 需改进'}\n"
-        report += f"  时间平衡性:       {st['time_balance_score']:.1%}  "
-        report += f"{'✓ 优秀' if st['time_balance_score'] >= 0.7 else '✗ 需改进'}\n"
-        report += f"  过渡自然性:       {st['transition_score']:.1%}  "
-        report += f"{'✓ 优秀' if st['transition_score'] >= 0.6 else '✗ 需改进'}\n"
-        report += f"  组织结构:         {st['organization_score']:.1%}  "
-        report += f"{'✓ 优秀' if st['organization_score'] >= 0.8 else '✗ 需改进'}\n"
-        report += f"  综合得分:         {st['overall_score']:.1%}\n\n"
+        yield row("逻辑连贯性:       ", st['coherence_score'], 0.8)
+        yield row("时间平衡性:       ", st['time_balance_score'], 0.7)
+        yield row("过渡自然性:       ", st['transition_score'], 0.6)
+        yield row("组织结构:         ", st['organization_score'], 0.8)
+        yield f"  综合得分:         {st['overall_score']:.1%}\n\n"
 
         # 3. 语言质量
-        report += "【3. 语言质量】 权重: 20%\n"
-        report += "-" * 70 + "\n"
+        yield "【3. 语言质量】 权重: 20%\n"
+        yield "-" * 70 + "\n"
         lq = results['language_quality']
-        report += f"  表达清晰度:       {lq['clarity_score']:.1%}  "
-        report += f"{'✓ 优秀' if lq['clarity_score'] >= 0.7 else '✗ 需改进'}\n"
-        report += f"  口语化程度:       {lq['conversational_score']:.1%}  "
-        report += f"{'✓ 优秀' if lq['conversational_score'] >= 0.6 else '✗ 需改进'}\n"
-        report += f"  词汇丰富度:       {lq['vocabulary_richness']:.1%}  "
-        report += f"{'✓ 优秀' if lq['vocabulary_richness'] >= 0.5 else '✗ 需改进'}\n"
-        report += f"  专业性:           {lq['professionalism_score']:.1%}  "
-        report += f"{'✓ 优秀' if lq['professionalism_score'] >= 0.7 else '✗ 需改进'}\n"
-        report += f"  综合得分:         {lq['overall_score']:.1%}\n\n"
+        yield row("表达清晰度:       ", lq['clarity_score'], 0.7)
+        yield row("口语化程度:       ", lq['conversational_score'], 0.6)
+        yield row("词汇丰富度:       ", lq['vocabulary_richness'], 0.5)
+        yield row("专业性:           ", lq['professionalism_score'], 0.7)
+        yield f"  综合得分:         {lq['overall_score']:.1%}\n\n"
 
         # 4. 细节丰富度
-        report += "【4. 细节丰富度】 权重: 15%\n"
-        report += "-" * 70 + "\n"
+        yield "【4. 细节丰富度】 权重: 15%\n"
+        yield "-" * 70 + "\n"
         dr = results['detail_richness']
-        report += f"  内容扩展比:       {dr['expansion_ratio_score']:.1%}  "
-        report += f"{'✓ 优秀' if dr['expansion_ratio_score'] >= 0.7 else '✗ 需改进'}\n"
-        report += f"  例子使用:         {dr['example_usage_score']:.1%}  "
-        report += f"{'✓ 优秀' if dr['example_usage_score'] >= 0.5 else '✗ 需改进'}\n"
-        report += f"  解释质量:         {dr['explanation_quality']:.1%}  "
-        report += f"{'✓ 优秀' if dr['explanation_quality'] >= 0.5 else '✗ 需改进'}\n"
-        report += f"  背景信息:         {dr['context_provision']:.1%}  "
-        report += f"{'✓ 优秀' if dr['context_provision'] >= 0.6 else '✗ 需改进'}\n"
-        report += f"  综合得分:         {dr['overall_score']:.1%}\n\n"
+        yield row("内容扩展比:       ", dr['expansion_ratio_score'], 0.7)
+        yield row("例子使用:         ", dr['example_usage_score'], 0.5)
+        yield row("解释质量:         ", dr['explanation_quality'], 0.5)
+        yield row("背景信息:         ", dr['context_provision'], 0.6)
+        yield f"  综合得分:         {dr['overall_score']:.1%}\n\n"
 
         # 5. 时间规划
-        report += "【5. 时间规划】 权重: 10%\n"
-        report += "-" * 70 + "\n"
+        yield "【5. 时间规划】 权重: 10%\n"
+        yield "-" * 70 + "\n"
         tm = results['time_management']
         total_mins = tm['total_minutes']
         total_secs = int(total_mins * 60)
-        report += f"  总时长:           {total_mins:.1f} 分钟 ({total_secs}秒)  "
-        report += f"{'✓ 合理' if 10 <= total_mins <= 30 else '⚠ 注意'}\n"
-        report += f"  时长合理性:       {tm['duration_appropriateness']:.1%}  "
-        report += f"{'✓ 优秀' if tm['duration_appropriateness'] >= 0.7 else '✗ 需改进'}\n"
-        report += f"  时间分布:         {tm['time_distribution_score']:.1%}  "
-        report += f"{'✓ 优秀' if tm['time_distribution_score'] >= 0.6 else '✗ 需改进'}\n"
-        report += f"  节奏一致性:       {tm['pace_consistency']:.1%}  "
-        report += f"{'✓ 优秀' if tm['pace_consistency'] >= 0.7 else '✗ 需改进'}\n"
-        report += f"  综合得分:         {tm['overall_score']:.1%}\n\n"
+        yield f"  总时长:           {total_mins:.1f} 分钟 ({total_secs}秒)  "
+        yield f"{'✓ 合理' if 10 <= total_mins <= 30 else '⚠ 注意'}\n"
+        yield row("时长合理性:       ", tm['duration_appropriateness'], 0.7)
+        yield row("时间分布:         ", tm['time_distribution_score'], 0.6)
+        yield row("节奏一致性:       ", tm['pace_consistency'], 0.7)
+        yield f"  综合得分:         {tm['overall_score']:.1%}\n\n"
 
         # 改进建议
-        report += "=" * 70 + "\n"
-        report += "改进建议:\n"
-        report += "=" * 70 + "\n"
-        suggestions = self._generate_suggestions(results)
-        report += suggestions + "\n"
+        yield "=" * 70 + "\n"
+        yield "改进建议:\n"
+        yield "=" * 70 + "\n"
+        yield self._generate_suggestions(results) + "\n"
 
         # 优点总结
-        report += "=" * 70 + "\n"
-        report += "优点总结:\n"
-        report += "=" * 70 + "\n"
-        strengths = self._generate_strengths(results)
-        report += strengths + "\n"
-
-        report += "=" * 70 + "\n"
-        report += "评估完成!\n"
-        report += "=" * 70 + "\n"
+        yield "=" * 70 + "\n"
+        yield "优点总结:\n"
+        yield "=" * 70 + "\n"
+        yield self._generate_strengths(results) + "\n"
 
-        return report
+        yield "=" * 70 + "\n"
+        yield "评估完成!\n"
+        yield "=" * 70 + "\n"
 
     def _generate_suggestions(self, results: Dict) -> str:
         """生成改进建议"""
-        suggestions = []
-
-        cc = results['content_consistency']
-        st = results['structure']
-        lq = results['language_quality']
-        dr = results['detail_richness']
-        tm = results['time_management']
-
         # 按优先级排序
-        priority_issues = []
+        priority_issues = [message
+                           for category, rules in _SUGGESTION_RULES
+                           for scores in (results[category],)  # 每个维度的结果字典只取一次
+                           for key, op, threshold, message in rules
+                           if op(scores[key], threshold)]
 
-        # 内容一致性问题（最高优先级）
-        if cc['keyword_coverage'] < 0.6:
-            priority_issues.append(
-                " [高优先级] 关键词覆盖不足 - 确保幻灯片中的重要概念都在演讲稿中体现"
-            )
-        if cc['slide_title_coverage'] < 0.7:
-            priority_issues.append(
-                " [高优先级] 幻灯片标题覆盖不完整 - 每张幻灯片的主题都应在演讲中明确提及"
-            )
-        if cc['hallucination_risk_score'] > 0.4:
-            priority_issues.append(
-                " [高优先级] 幻觉风险较高 - 减少幻灯片中未出现的额外内容，保持一致性"
-            )
-        if cc['fact_accuracy'] < 0.7:
-            priority_issues.append(
-                " [高优先级] 事实准确性不足 - 确保幻灯片中的数字、人名等关键事实被准确传达"
-            )
-
-        # 结构问题（高优先级）
-        if st['coherence_score'] < 0.7:
-            priority_issues.append(
-                " [中优先级] 逻辑连贯性有待提升 - 确保演讲内容按照幻灯片顺序展开"
-            )
-        if st['transition_score'] < 0.5:
-            priority_issues.append(
-                " [中优先级] 缺少过渡语句 - 在段落间添加'接下来'、'让我们看看'等过渡词"
-            )
-        if st['time_balance_score'] < 0.6:
-            priority_issues.append(
-                " [中优先级] 时间分配不均衡 - 调整各部分时长，避免某些部分过长或过短"
-            )
-
-        # 语言质量问题（中优先级）
-        if lq['conversational_score'] < 0.5:
-            priority_issues.append(
-                " [中低优先级] 口语化程度不足 - 使用更多'我们'、'让我们'等口语化表达"
-            )
-        if lq['clarity_score'] < 0.6:
-            priority_issues.append(
-                " [中低优先级] 句子长度需优化 - 调整句子长度，建议12-25词为宜"
-            )
-        if lq['professionalism_score'] < 0.6:
-            priority_issues.append(
-                " [中低优先级] 专业性不足 - 适当使用幻灯片中的专业术语和概念"
-            )
-
-        # 细节问题（较低优先级）
-        if dr['example_usage_score'] < 0.4:
-            priority_issues.append(
-                " [低优先级] 缺少具体例子 - 为抽象概念添加具体案例说明"
-            )
-        if dr['explanation_quality'] < 0.4:
-            priority_issues.append(
-                " [低优先级] 解释不够充分 - 为技术术语和复杂概念提供更多解释"
-            )
-        if dr['expansion_ratio_score'] < 0.5:
-            priority_issues.append(
-                " [低优先级] 内容扩展不足 - 适当增加细节描述，丰富演讲内容"
-            )
-
-        # 时间问题
+        # 时间问题（建议中带有当前时长，单独处理）
+        tm = results['time_management']
         if tm['duration_appropriateness'] < 0.6:
             total_mins = tm['total_minutes']
             total_secs = int(total_mins * 60)
@@ -877,64 +1046,29 @@ class SpeechEvaluator:
         if priority_issues:
             suggestions = priority_issues
         else:
-            suggestions = [" 整体质量优秀，各项指标均达标，继续保持！"]
+            suggestions = [_NO_ISSUES_MESSAGE]
 
         # 添加通用建议
         if results['overall_score'] < 0.7:
-            suggestions.append("\n 总体建议: 重点关注内容一致性和结构合理性，这是演讲稿的基础")
+            suggestions.append(_OVERALL_ADVICE_LOW)
         elif results['overall_score'] < 0.85:
-            suggestions.append("\n 总体建议: 在保持现有质量的基础上，可进一步优化语言表达和细节丰富度")
+            suggestions.append(_OVERALL_ADVICE_MID)
 
-        return '\n'.join(f"  {i+1}. {s}" for i, s in enumerate(suggestions))
+        return '\n'.join(map(_SUGGESTION_ITEM_FMT, itertools.count(1), suggestions))
 
 
     def _generate_strengths(self, results: Dict) -> str:
         """生成优点总结"""
-        strengths = []
-
-        cc = results['content_consistency']
-        st = results['structure']
-        lq = results['language_quality']
-        dr = results['detail_richness']
-        tm = results['time_management']
-
-        if cc['keyword_coverage'] >= 0.75:
-            strengths.append("✓ 关键词覆盖全面，准确传达了幻灯片核心内容")
-        if cc['fact_accuracy'] >= 0.8:
-            strengths.append("✓ 事实数据准确，保持了良好的信息一致性")
-        if cc['hallucination_risk_score'] <= 0.25:
-            strengths.append("✓ 内容忠实于原材料，幻觉风险控制良好")
-
-        if st['coherence_score'] >= 0.8:
-            strengths.append("✓ 逻辑结构清晰，演讲流程合理")
-        if st['transition_score'] >= 0.65:
-            strengths.append("✓ 段落过渡自然，听众体验流畅")
-        if st['organization_score'] >= 0.8:
-            strengths.append("✓ 整体组织结构完整，有明确的引入和总结")
-
-        if lq['conversational_score'] >= 0.6:
-            strengths.append("✓ 口语化表达自然，适合现场演讲")
-        if lq['clarity_score'] >= 0.75:
-            strengths.append("✓ 表达清晰易懂，句子长度适中")
-        if lq['professionalism_score'] >= 0.7:
-            strengths.append("✓ 专业性强，恰当使用了学术术语")
-
-        if dr['example_usage_score'] >= 0.5:
-            strengths.append("✓ 合理使用例子，帮助听众理解")
-        if dr['explanation_quality'] >= 0.5:
-            strengths.append("✓ 解释充分，技术概念阐述清楚")
-        if dr['context_provision'] >= 0.65:
-            strengths.append("✓ 提供了充足的背景信息")
-
-        if tm['duration_appropriateness'] >= 0.75:
-            strengths.append("✓ 时长规划合理，符合演讲场合要求")
-        if tm['time_distribution_score'] >= 0.7:
-            strengths.append("✓ 时间分配得当，重点突出")
+        strengths = [message
+                     for category, rules in _STRENGTH_RULES
+                     for scores in (results[category],)  # 每个维度的结果字典只取一次
+                     for key, op, threshold, message in rules
+                     if op(scores[key], threshold)]
 
         if not strengths:
-            strengths = ["继续努力，提升各项指标"]
+            strengths = [_NO_STRENGTHS_MESSAGE]
 
-        return '\n'.join(f"  • {s}" for s in strengths)
+        return '\n'.join(map(_STRENGTH_ITEM_FMT, strengths))
 
 
 # ============ 使用示例 ============
@@ -948,25 +1082,54 @@ def evaluate_from_files(pdf_text: str, speech_json_path: str):
         speech_json_path: 演讲稿JSON文件路径
     """
     # 读取演讲稿JSON
-    with open(speech_json_path, 'r', encoding='utf-8') as f:
-        speech_json = f.read()
+    with open(speech_json_path, 'rb', buffering=128 * 1024) as f:
+        speech_json = f.read().decode('utf-8')
 
     # 创建评估器
     evaluator = SpeechEvaluator(pdf_text, speech_json)
 
-    # 生成并打印报告
-    report = evaluator.generate_report()
-    print(report)
+    # 先完成评估（结果会被缓存），评估出错时不会留下不完整的报告文件
+    results = evaluator.evaluate_all()
 
-    # 保存报告
-    with open('evaluation_report_'+speech_json_path, 'w', encoding='utf-8') as f:
-        f.write(report)
+    # 报告与演讲稿放在同一目录，文件名加前缀（直接拼接路径会把前缀加到目录名上）
+    report_path = os.path.join(os.path.dirname(speech_json_path),
+                               'evaluation_report_' + os.path.basename(speech_json_path))
 
-    print("\n 报告已保存到: evaluation_report_"+speech_json_path)
+    # 逐段打印报告并同时写入文件
+    with open(report_path, 'wb', buffering=128 * 1024) as f:
+        for fragment in evaluator.iter_report():
+            sys.stdout.write(fragment)
+            f.write(fragment.encode('utf-8'))
+    print()
+
+    print("\n 报告已保存到: " + report_path)
 
     # 返回评估结果供进一步分析
-    return evaluator.evaluate_all()
+    return results
+
+
+def evaluate_many(pdf_path: str, speech_json_paths: List[str]) -> Dict[str, Dict]:
+    """
+    用同一份PDF幻灯片评估多份演讲稿，PDF文本只提取一次
+
+    Args:
+        pdf_path: PDF幻灯片路径（提取结果由evaluate_system按修改时间缓存到<pdf>.txt.cache）
+        speech_json_paths: 演讲稿JSON文件路径列表
+
+    Returns:
+        {演讲稿路径: 评估结果}
+    """
+    from evaluate_system import extract_text_from_pdf, extract_text_from_pdf_pypdf2
+
+    pdf_text = extract_text_from_pdf(pdf_path)
+    if pdf_text is None:
+        pdf_text = extract_text_from_pdf_pypdf2(pdf_path)
+    if pdf_text is None:
+        print(f"无法提取PDF文本: {pdf_path}")
+        return {}
+
+    return {path: evaluate_from_files(pdf_text, path) for path in speech_json_paths}
 
 
 if __name__ == "__main__":
-    evaluate_from_files('presentation.pdf', 'speech_qwen_vl.txt')
\ No newline at end of file
+    evaluate_many('presentation.pdf', ['speech_qwen_vl.txt'])
\ No newline at end of file